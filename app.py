@@ -4,23 +4,28 @@ Provides REST endpoints for FlightAware aviation data using RAG with Pinecone
 
 Endpoints:
 - POST /chat - Main chat endpoint with user_id and query
+- POST /chat/stream - Same as /chat, streamed token by token as Server-Sent Events
 - GET /health - Health check endpoint
+- GET /stats - Cache and memory metrics
 - POST /chat/agent - Chat with agent mode for complex queries
 - DELETE /chat/{user_id} - Clear conversation history for a user
+- DELETE /chat?idle_minutes=N - Purge conversations idle for more than N minutes
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict, Any
 from contextlib import asynccontextmanager
+import json
 import logging
 import os
 from datetime import datetime
 import uvicorn
 
 # Import our RAG functions
-from rag import initialize_rag_system, get_response, get_conversation_summary, clear_conversation
+from rag import initialize_rag_system, aget_response, astream_response, get_conversation_summary, aclear_conversation, apurge_idle_conversations, get_system_stats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -92,6 +97,7 @@ class ChatResponse(BaseModel):
     source_urls: Optional[list] = Field(default_factory=list, description="List of source URLs from retrieved documents")
     timestamp: float = Field(..., description="Unix timestamp of response")
     error: Optional[str] = Field(None, description="Error message if any")
+    cache: Optional[Dict[str, Any]] = Field(None, description="Semantic cache hit, similarity, latency saved and hit rate (when enabled)")
     status_code: int = Field(200, description="HTTP status code")
     
     model_config = {
@@ -118,10 +124,25 @@ class HealthResponse(BaseModel):
     models_loaded: bool
     status_code: int = Field(200, description="HTTP status code")
 
+class StatsResponse(BaseModel):
+    stats: Dict[str, Any] = Field(default_factory=dict, description="Cache and memory metrics by component")
+    timestamp: float
+    status_code: int = Field(200, description="HTTP status code")
+
 class ConversationClearResponse(BaseModel):
     user_id: str
     message: str
+    bytes_reclaimed: int = Field(0, description="Serialized conversation bytes freed")
+    timestamp: float
+    status_code: int = Field(200, description="HTTP status code")
+
+class ConversationPurgeResponse(BaseModel):
+    idle_minutes: float
+    threads_cleared: int
+    bytes_reclaimed: int = Field(0, description="Serialized conversation bytes freed")
+    message: str
     timestamp: float
+    status_code: int = Field(200, description="HTTP status code")
     
 class ConversationSummaryResponse(BaseModel):
     user_id: str
@@ -158,6 +179,18 @@ async def health_check():
             status_code=500
         )
 
+# Metrics endpoint
+@app.get("/stats", response_model=StatsResponse, tags=["Health"])
+async def stats_endpoint():
+    """
+    Cache hit rates and memory usage of the running worker
+    """
+    return StatsResponse(
+        stats=get_system_stats(),
+        timestamp=datetime.now().timestamp(),
+        status_code=200
+    )
+
 # Main chat endpoint
 @app.post("/chat", response_model=ChatResponse, tags=["Chat"])
 async def chat_endpoint(request: ChatRequest):
@@ -185,8 +218,9 @@ async def chat_endpoint(request: ChatRequest):
     try:
         logger.info(f"Processing chat request for user {request.user_id}")
         
-        # Get response using function-based approach
-        response_data = get_response(
+        # Await the async pipeline so slow OpenAI/Pinecone calls don't block
+        # other requests on this worker's event loop
+        response_data = await aget_response(
             message=request.query,
             user_id=request.user_id,
             use_agent=request.use_agent
@@ -205,6 +239,100 @@ async def chat_endpoint(request: ChatRequest):
             detail=f"Error processing your message: {str(e)}"
         )
 
+# Streaming chat endpoint
+@app.post("/chat/stream", tags=["Chat"])
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming variant of /chat using Server-Sent Events
+    
+    **Events:**
+    - **token**: `{"content": "..."}` for each LLM token as it is generated
+    - **done**: the full ChatResponse payload, including `source_urls` and `data_source`
+    """
+    if not system_initialized:
+        raise HTTPException(
+            status_code=503, 
+            detail="FlightAware system is not initialized. Please check server logs."
+        )
+    
+    logger.info(f"Processing streaming chat request for user {request.user_id}")
+    
+    async def event_source():
+        async for event, data in astream_response(
+            message=request.query,
+            user_id=request.user_id,
+            use_agent=request.use_agent
+        ):
+            if event == "done":
+                data = ChatResponse(**data).model_dump()
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Conversation management endpoints
+@app.delete("/chat/{user_id}", response_model=ConversationClearResponse, tags=["Chat"])
+async def clear_conversation_endpoint(user_id: str):
+    """
+    Clear the conversation history of a user and free its memory
+    """
+    if not system_initialized:
+        raise HTTPException(
+            status_code=503, 
+            detail="FlightAware system is not initialized. Please check server logs."
+        )
+    
+    try:
+        result = await aclear_conversation(user_id)
+        return ConversationClearResponse(
+            user_id=user_id,
+            message=f"Conversation history cleared for user {user_id}",
+            bytes_reclaimed=result["bytes_reclaimed"],
+            timestamp=datetime.now().timestamp(),
+            status_code=200
+        )
+    except Exception as e:
+        logger.error(f"Error clearing conversation for user {user_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error clearing conversation: {str(e)}"
+        )
+
+@app.delete("/chat", response_model=ConversationPurgeResponse, tags=["Chat"])
+async def purge_conversations_endpoint(
+    idle_minutes: float = Query(..., gt=0, description="Delete conversations idle for longer than this many minutes")
+):
+    """
+    Bulk purge of idle conversations to reclaim memory without restarting workers
+    """
+    if not system_initialized:
+        raise HTTPException(
+            status_code=503, 
+            detail="FlightAware system is not initialized. Please check server logs."
+        )
+    
+    try:
+        result = await apurge_idle_conversations(idle_minutes)
+        logger.info(f"Purged {result['threads_cleared']} idle conversations ({result['bytes_reclaimed']} bytes)")
+        return ConversationPurgeResponse(
+            idle_minutes=idle_minutes,
+            threads_cleared=result["threads_cleared"],
+            bytes_reclaimed=result["bytes_reclaimed"],
+            message=f"Purged {result['threads_cleared']} conversations idle for more than {idle_minutes} minutes",
+            timestamp=datetime.now().timestamp(),
+            status_code=200
+        )
+    except Exception as e:
+        logger.error(f"Error purging idle conversations: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error purging conversations: {str(e)}"
+        )
+
 
 # Run the application
 if __name__ == "__main__":
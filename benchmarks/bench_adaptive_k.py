@@ -0,0 +1,76 @@
+"""
+Chunks and context tokens per query: fixed k vs score-threshold adaptive k
+
+Uses a local FAISS index over the chunks JSONPineconeManager produces from
+the scraped data (LexicalEmbeddings, see bench_mmr) and applies
+retrieval.adaptive_cutoff to the top-k_max similarity scores, the way
+search_flightaware does with ADAPTIVE_K_ENABLED=true.
+
+Usage:
+    python -m benchmarks.bench_adaptive_k --k-max 5 --relative 0.8 --max-drop 0.1
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from vector_database_manager import JSONPineconeManager
+
+from benchmarks.fakes import LexicalEmbeddings
+from context import pack_context
+from retrieval import adaptive_cutoff
+
+QUERIES = [
+    "AeroAPI pricing", "Firehose", "ADS-B receiver", "KJFK arrivals",
+    "How does FlightAware Foresight predict ETAs?", "flight tracking API for airlines",
+    "PiAware setup", "airport delays", "FlightAware Global", "historical flight data",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--k-max", type=int, default=5)
+    parser.add_argument("--min-score", type=float, default=0.0)
+    parser.add_argument("--relative", type=float, default=0.8)
+    parser.add_argument("--max-drop", type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+    store = FAISS.from_documents(documents, LexicalEmbeddings(), normalize_L2=True,
+                                 distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT)
+
+    fixed_tokens = adaptive_tokens = kept = 0
+    cutoff_seconds = 0.0
+    print(f"{'query':45s} {'scores':32s} {'k':>2s} {'tokens fixed/adaptive':>22s}")
+    for query in QUERIES:
+        hits = store.similarity_search_with_score(query, k=args.k_max)
+        scores = [float(score) for _, score in hits]
+        start = time.perf_counter()
+        k = adaptive_cutoff(scores, args.k_max, min_score=args.min_score,
+                            relative_score=args.relative, max_drop=args.max_drop)
+        cutoff_seconds += time.perf_counter() - start
+        docs = [doc for doc, _ in hits]
+        fixed = pack_context(docs, 100000)[1]["packed_tokens"]
+        adaptive = pack_context(docs[:k], 100000)[1]["packed_tokens"]
+        fixed_tokens += fixed
+        adaptive_tokens += adaptive
+        kept += k
+        print(f"{query[:45]:45s} {' '.join(f'{s:.2f}' for s in scores):32s} {k:2d} {fixed:>11d}/{adaptive:<10d}")
+
+    n = len(QUERIES)
+    print(f"\nMean chunks: fixed {args.k_max}, adaptive {kept / n:.1f}")
+    print(f"Context tokens: {fixed_tokens} -> {adaptive_tokens} ({1 - adaptive_tokens / fixed_tokens:.0%} fewer), "
+          f"cutoff {cutoff_seconds / n * 1e6:.0f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark of the BM25 keyword index used for hybrid retrieval
+
+Builds the index over the same chunks JSONPineconeManager.json_to_documents
+produces from the scraped data and times keyword queries (exact product names
+and codes, which dense retrieval tends to rank poorly).
+
+Usage:
+    python -m benchmarks.bench_bm25 --iterations 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+from vector_database_manager import JSONPineconeManager
+
+from retrieval import BM25Index
+
+QUERIES = ["AeroAPI pricing", "Firehose", "ADS-B receiver", "KJFK arrivals", "How does FlightAware Foresight predict ETAs?"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+
+    start = time.perf_counter()
+    index = BM25Index(documents)
+    print(f"Built BM25 index over {len(index)} chunks, {len(index.vocabulary)} terms "
+          f"in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    for query in QUERIES:
+        seconds = timeit.timeit(lambda: index.search(query, k=args.k), number=args.iterations)
+        top = index.search(query, k=1)
+        title = top[0][0].metadata.get("title", "")[:50] if top else "-"
+        print(f"{query[:40]:40s} {seconds / args.iterations * 1e6:8.1f} µs/query  top: {title}")
+
+
+if __name__ == "__main__":
+    main()
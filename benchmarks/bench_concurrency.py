@@ -0,0 +1,64 @@
+"""
+Load benchmark: concurrent /chat requests against a fake LLM and vector store
+
+Compares the previous behaviour (sync get_response called from the async
+endpoint) with the awaited aget_response path. With N concurrent requests the
+blocking path takes ~N x single-request latency, the async path ~1x.
+
+Usage:
+    python -m benchmarks.bench_concurrency --requests 20 --llm-delay 0.2
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import time
+
+import httpx
+
+from benchmarks.fakes import setup_fake_rag_system
+
+
+async def run_load(app, path: str, n_requests: int) -> float:
+    """Fire n_requests concurrent POSTs and return the wall-clock time"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(path, json={"user_id": f"bench{i}", "query": "What is AeroAPI?", "use_agent": False})
+            for i in range(n_requests)
+        ])
+        elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200]
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=0.2)
+    parser.add_argument("--search-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rag = setup_fake_rag_system(llm_delay=args.llm_delay, search_delay=args.search_delay)
+    import app as app_module
+    app_module.system_initialized = True
+
+    # Previous endpoint body: the sync pipeline called straight from async def
+    @app_module.app.post("/bench/blocking")
+    async def blocking_chat(request: app_module.ChatRequest):
+        return rag.get_response(request.query, request.user_id, request.use_agent)
+
+    single = 2 * args.llm_delay + args.search_delay
+    print(f"Single request latency (fake): ~{single:.2f}s, {args.requests} concurrent requests")
+    for label, path in (("blocking get_response", "/bench/blocking"), ("async aget_response", "/chat")):
+        with contextlib.redirect_stdout(io.StringIO()):
+            elapsed = asyncio.run(run_load(app_module.app, path, args.requests))
+        print(f"{label:24s} total {elapsed:6.2f}s  ({elapsed / single:5.1f}x single-request latency)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Prompt tokens of the retrieval context: one block per chunk, packed per page,
+and compressed to the query's best sentences
+
+Retrieves candidates with the BM25 index over the chunks JSONPineconeManager
+produces from the scraped data, then compares the previous serialization
+(one Source/Title/Content block per chunk) with pack_context. Also checks
+that every sentence of the retrieved chunks is still in the packed context
+when the budget is not hit.
+
+compress_context is measured by its compression ratio and by query-term
+coverage: the share of the query terms found in the retrieved chunks that
+are still in the compressed context.
+
+Usage:
+    python -m benchmarks.bench_context --k 5 --compressed-tokens 800
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+from vector_database_manager import JSONPineconeManager
+
+from context import compress_context, format_block, pack_context
+from retrieval import BM25Index, tokenize
+from token_counter import count_tokens
+
+QUERIES = [
+    "AeroAPI pricing", "Firehose", "ADS-B receiver", "KJFK arrivals",
+    "How does FlightAware Foresight predict ETAs?", "flight tracking API for airlines",
+    "PiAware setup", "airport delays", "FlightAware Global", "historical flight data",
+]
+
+
+def sentences(text: str) -> set:
+    return {s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if len(s.strip()) > 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=3000)
+    parser.add_argument("--compressed-tokens", type=int, default=800)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+    index = BM25Index(documents)
+
+    total_raw = total_packed = total_compressed = lost = 0
+    elapsed = compress_elapsed = coverage = 0.0
+    print(f"{'query':45s} {'chunks':>6s} {'pages':>5s} {'raw':>6s} {'packed':>6s} {'compressed':>10s} {'ratio':>5s}")
+    for query in QUERIES:
+        docs = [doc for doc, _ in index.search(query, k=args.k)]
+        raw = "\n\n".join(format_block(doc, doc.page_content) for doc in docs)
+        start = time.perf_counter()
+        packed, stats = pack_context(docs, args.budget)
+        elapsed += time.perf_counter() - start
+        raw_tokens = count_tokens(raw)
+        total_raw += raw_tokens
+        total_packed += stats["packed_tokens"]
+        if stats["packed_tokens"] < args.budget:
+            lost += sum(1 for doc in docs for s in sentences(doc.page_content) if s not in packed)
+
+        start = time.perf_counter()
+        compressed, compressed_stats = compress_context(docs, query, args.compressed_tokens)
+        compress_elapsed += time.perf_counter() - start
+        total_compressed += compressed_stats["packed_tokens"]
+        found = set(tokenize(query)) & set(tokenize(raw))
+        coverage += len(found & set(tokenize(compressed))) / len(found) if found else 1.0
+        print(f"{query[:45]:45s} {len(docs):6d} {stats['pages']:5d} {raw_tokens:6d} {stats['packed_tokens']:6d} "
+              f"{compressed_stats['packed_tokens']:10d} {compressed_stats['compression_ratio']:5.2f}")
+
+    saved = 1 - total_packed / total_raw if total_raw else 0.0
+    print(f"\nTotal: {total_raw} -> {total_packed} tokens ({saved:.1%} fewer), "
+          f"{lost} sentences lost, {elapsed / len(QUERIES) * 1e3:.2f} ms/query packing")
+    print(f"Compressed: {total_raw} -> {total_compressed} tokens (ratio {total_compressed / total_raw:.2f}), "
+          f"{coverage / len(QUERIES):.0%} query-term coverage, {compress_elapsed / len(QUERIES) * 1e3:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
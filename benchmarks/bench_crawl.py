@@ -0,0 +1,62 @@
+"""
+Crawl benchmark against a local fixture site
+
+Compares the sequential FlightAwareScraper.scrape (one request at a time plus
+a politeness delay) with the concurrent aiohttp crawl (ascrape).
+
+Usage:
+    python -m benchmarks.bench_crawl --pages 60 --latency 0.1 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraping"))
+
+from flightaware_scraper import FlightAwareScraper
+
+from benchmarks.fixture_site import start_fixture_site
+
+
+def make_scraper(base_url: str, pages: int, delay: float) -> FlightAwareScraper:
+    return FlightAwareScraper(base_urls=[f"{base_url}/page/0"], max_pages=pages, delay=delay,
+                              allowed_domains=[urlparse(base_url).netloc])
+
+
+def report(label: str, scraper: FlightAwareScraper, elapsed: float):
+    print(f"{label:34s} {elapsed:6.2f}s  {len(scraper.scraped_data) / elapsed:6.1f} pages/sec  "
+          f"({len(scraper.scraped_data)} pages)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.1, help="Server response latency (seconds)")
+    parser.add_argument("--page-kb", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=1.0, help="Politeness delay of the sequential crawl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=20.0, help="Per-host request limit of the concurrent crawl")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    _, base_url = start_fixture_site(pages=args.pages, latency=args.latency, page_kb=args.page_kb)
+    print(f"{args.pages} fixture pages of ~{args.page_kb} KB, {args.latency * 1000:.0f} ms server latency")
+
+    scraper = make_scraper(base_url, args.pages, args.delay)
+    start = time.perf_counter()
+    scraper.scrape()
+    report(f"sequential (delay {args.delay:g}s)", scraper, time.perf_counter() - start)
+
+    scraper = make_scraper(base_url, args.pages, args.delay)
+    start = time.perf_counter()
+    asyncio.run(scraper.ascrape(concurrency=args.concurrency, requests_per_second=args.rps))
+    report(f"concurrent ({args.concurrency} workers, {args.rps:g} req/s)", scraper, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
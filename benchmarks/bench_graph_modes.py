@@ -0,0 +1,58 @@
+"""
+Latency benchmark: tool-decision graph vs retrieve-first graph
+
+The default graph makes two sequential LLM calls per turn (one to decide on
+the retrieval tool, one to answer); retrieve_first retrieves on the condensed
+query and makes a single generation call. Uses the fake LLM and vector store
+with injected delays, so the difference is the round trips saved.
+
+Usage:
+    python -m benchmarks.bench_graph_modes --turns 10 --llm-delay 0.3
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+from benchmarks.fakes import setup_fake_rag_system
+
+QUESTIONS = [
+    "What is AeroAPI?",
+    "How much does it cost?",
+    "What data does Firehose provide for airlines?",
+    "Can I use that for historical flights?",
+]
+
+
+async def run_turns(rag, user_id: str, turns: int) -> list:
+    """Run sequential turns for one user and return per-turn latencies"""
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        result = await rag.aget_response(QUESTIONS[i % len(QUESTIONS)], user_id)
+        latencies.append(time.perf_counter() - start)
+        assert result["source_urls"], result
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    parser.add_argument("--search-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{args.turns} turns, fake LLM {args.llm_delay:.2f}s/call, search {args.search_delay:.2f}s")
+    for mode in ("tool_decision", "retrieve_first"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            rag = setup_fake_rag_system(llm_delay=args.llm_delay, search_delay=args.search_delay, graph_mode=mode)
+            latencies = asyncio.run(run_turns(rag, f"bench-{mode}", args.turns))
+        print(f"{mode:16s} mean {statistics.mean(latencies):6.3f}s  "
+              f"p50 {statistics.median(latencies):6.3f}s  max {max(latencies):6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
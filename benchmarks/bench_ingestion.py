@@ -0,0 +1,78 @@
+"""
+Offline ingestion benchmark: sequential batches vs the pipelined uploader
+
+Runs both over the real chunks of the scraped data with a fake embedding API
+and fake Pinecone index (injected latency and a requests-per-second limit that
+answers with 429s). The sequential baseline is the previous
+create_vector_store loop: 100 chunks per batch, embed, upsert, sleep.
+
+Usage:
+    python -m benchmarks.bench_ingestion --embed-rps 8 --baseline-sleep 1.0
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+from ingestion_pipeline import EmbeddingUploadPipeline, TEXT_KEY
+from vector_database_manager import JSONPineconeManager
+
+from benchmarks.fakes import FakeEmbeddings, FakeIndex
+
+
+def sequential_upload(documents, embeddings, index, batch_size: int, sleep: float) -> float:
+    """The previous create_vector_store loop"""
+    start = time.perf_counter()
+    for i in range(0, len(documents), batch_size):
+        batch = documents[i:i + batch_size]
+        vectors = embeddings.embed_documents([doc.page_content for doc in batch])
+        index.upsert(vectors=[
+            {"id": f"{i + j}", "values": vector, "metadata": {**doc.metadata, TEXT_KEY: doc.page_content}}
+            for j, (doc, vector) in enumerate(zip(batch, vectors))
+        ])
+        time.sleep(sleep)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--embed-delay", type=float, default=0.3)
+    parser.add_argument("--upsert-delay", type=float, default=0.15)
+    parser.add_argument("--embed-rps", type=float, default=8, help="Embedding requests/sec before 429s")
+    parser.add_argument("--baseline-sleep", type=float, default=1.0)
+    parser.add_argument("--embed-workers", type=int, default=4)
+    parser.add_argument("--upsert-workers", type=int, default=2)
+    parser.add_argument("--max-batch-tokens", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+    print(f"{len(documents)} chunks, embed {args.embed_delay:.2f}s/request (limit {args.embed_rps:g}/s), "
+          f"upsert {args.upsert_delay:.2f}s/request")
+
+    def fakes():
+        return (FakeEmbeddings(delay=args.embed_delay, requests_per_second=args.embed_rps),
+                FakeIndex(delay=args.upsert_delay))
+
+    embeddings, index = fakes()
+    elapsed = sequential_upload(documents, embeddings, index, 100, args.baseline_sleep)
+    print(f"{'sequential (100/batch + sleep)':32s} {elapsed:6.2f}s  {len(documents) / elapsed:7.1f} chunks/sec  "
+          f"{embeddings.requests} embedding requests")
+
+    embeddings, index = fakes()
+    pipeline = EmbeddingUploadPipeline(embeddings, index, embed_workers=args.embed_workers,
+                                       upsert_workers=args.upsert_workers, max_batch_tokens=args.max_batch_tokens)
+    stats = pipeline.run(documents)
+    assert len(index.vectors) == len(documents)
+    print(f"{'pipelined':32s} {stats['elapsed_seconds']:6.2f}s  {stats['chunks_per_second']:7.1f} chunks/sec  "
+          f"{stats['embed_requests']} embedding requests, {stats['embed_rate_limited']} 429s")
+
+
+if __name__ == "__main__":
+    main()
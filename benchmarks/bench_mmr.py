@@ -0,0 +1,119 @@
+"""
+Diversity and latency of MMR retrieval vs plain top-k
+
+Builds a local FAISS index (the VECTOR_STORE_BACKEND=faiss layout) over the
+chunks JSONPineconeManager produces from the scraped data, embedded with
+LexicalEmbeddings so overlapping chunks of one page are near neighbours.
+For each query it compares the top-k of similarity_search with the MMR
+selection over an over-fetched pool: distinct pages, mean pairwise cosine
+of the selected chunks, and prompt tokens after pack_context.
+
+Usage:
+    python -m benchmarks.bench_mmr --k 5 --fetch-k 20
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from vector_database_manager import JSONPineconeManager
+
+import rag
+from benchmarks.fakes import LexicalEmbeddings
+from context import pack_context, page_key
+from retrieval import maximal_marginal_relevance, normalize_rows
+
+QUERIES = [
+    "AeroAPI pricing", "Firehose", "ADS-B receiver", "KJFK arrivals",
+    "How does FlightAware Foresight predict ETAs?", "flight tracking API for airlines",
+    "PiAware setup", "airport delays", "FlightAware Global", "historical flight data",
+]
+
+
+def mean_pairwise_cosine(vectors: np.ndarray) -> float:
+    if len(vectors) < 2:
+        return 0.0
+    vectors = normalize_rows(vectors)
+    similarity = vectors @ vectors.T
+    return float(similarity[np.triu_indices(len(vectors), 1)].mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, default=20)
+    parser.add_argument("--lambda-mult", type=float, default=0.5)
+    parser.add_argument("--page-penalty", type=float, default=rag.MMR_PAGE_PENALTY)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+    rag.embeddings = LexicalEmbeddings()
+    rag.json_vector_store = FAISS.from_documents(documents, rag.embeddings, normalize_L2=True,
+                                                 distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT)
+    print(f"FAISS index over {len(documents)} chunks\n")
+
+    totals = {"top": [0, 0.0, 0], "mmr": [0, 0.0, 0]}
+    top_seconds = mmr_seconds = 0.0
+    print(f"{'query':40s} {'pages top/mmr':>13s} {'cosine top/mmr':>15s} {'tokens top/mmr':>15s}")
+    for query in QUERIES:
+        query_vector = rag.embeddings.embed_query(query)
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            top_docs = rag.json_vector_store.similarity_search_by_vector(query_vector, k=args.k)
+        top_seconds += (time.perf_counter() - start) / args.iterations
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            candidates, _, vectors = rag.dense_candidates(query_vector, args.fetch_k)
+            selected = maximal_marginal_relevance(query_vector, vectors, args.k, args.lambda_mult,
+                                                  groups=[page_key(doc) for doc in candidates],
+                                                  group_penalty=args.page_penalty)
+        mmr_seconds += (time.perf_counter() - start) / args.iterations
+        mmr_docs = [candidates[i] for i in selected]
+
+        row = {}
+        for name, docs in (("top", top_docs), ("mmr", mmr_docs)):
+            doc_vectors = np.asarray(rag.embeddings.embed_documents([d.page_content for d in docs]))
+            pages = len({d.metadata.get("url") for d in docs})
+            cosine = mean_pairwise_cosine(doc_vectors)
+            tokens = pack_context(docs, 100000)[1]["packed_tokens"]
+            row[name] = (pages, cosine, tokens)
+            totals[name][0] += pages
+            totals[name][1] += cosine
+            totals[name][2] += tokens
+        print(f"{query[:40]:40s} {row['top'][0]:>6d}/{row['mmr'][0]:<6d} "
+              f"{row['top'][1]:>7.2f}/{row['mmr'][1]:<7.2f} {row['top'][2]:>7d}/{row['mmr'][2]:<7d}")
+
+    n = len(QUERIES)
+    print(f"\nMean distinct pages:     top {totals['top'][0] / n:.1f}   mmr {totals['mmr'][0] / n:.1f}")
+    print(f"Mean pairwise cosine:    top {totals['top'][1] / n:.2f}  mmr {totals['mmr'][1] / n:.2f}")
+    print(f"Mean context tokens:     top {totals['top'][2] / n:.0f}   mmr {totals['mmr'][2] / n:.0f}")
+    print(f"Retrieval latency:       top {top_seconds / n * 1e3:.2f} ms   "
+          f"mmr (fetch {args.fetch_k} + select) {mmr_seconds / n * 1e3:.2f} ms")
+
+    # Selection cost alone at the production embedding size (text-embedding-3-large)
+    rng = np.random.default_rng(0)
+    for fetch_k in (20, 50):
+        vectors = rng.standard_normal((fetch_k, 3072), dtype=np.float32)
+        query_vector = rng.standard_normal(3072, dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            maximal_marginal_relevance(query_vector, vectors, args.k, args.lambda_mult)
+        print(f"MMR selection, {fetch_k} x 3072 candidates: "
+              f"{(time.perf_counter() - start) / args.iterations * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
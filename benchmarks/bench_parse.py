@@ -0,0 +1,58 @@
+"""
+Parsing throughput benchmark for the scraper's process pool
+
+Parses a corpus of fixture pages with parse_page in 1..N worker processes
+(and with each available parser backend) and reports pages/sec, showing how
+extraction scales with cores once it is off the fetch path.
+
+Usage:
+    python -m benchmarks.bench_parse --pages 200 --page-kb 150
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraping"))
+
+from flightaware_scraper import parse_page, resolve_parser
+
+from benchmarks.fixture_site import DATA_FILE, render_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-kb", type=int, default=150)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    corpus = [render_page(i, args.pages, records[i % len(records)], args.page_kb, 4).encode("utf-8")
+              for i in range(args.pages)]
+    urls = [f"http://fixture/page/{i}" for i in range(args.pages)]
+    print(f"{args.pages} pages of ~{args.page_kb} KB, {os.cpu_count()} CPUs")
+
+    backends = sorted({"html.parser", resolve_parser("auto")})
+    workers = sorted({1, 2, 4, args.max_workers} & set(range(1, args.max_workers + 1)))
+    for backend in backends:
+        start = time.perf_counter()
+        for content, url in zip(corpus, urls):
+            parse_page(content, url, backend)
+        baseline = time.perf_counter() - start
+        print(f"{backend:12s} in-process      {args.pages / baseline:7.1f} pages/sec")
+        for n in workers:
+            with ProcessPoolExecutor(n) as pool:
+                start = time.perf_counter()
+                list(pool.map(parse_page, corpus, urls, [backend] * len(corpus), chunksize=4))
+                elapsed = time.perf_counter() - start
+            print(f"{backend:12s} {n:2d} processes    {args.pages / elapsed:7.1f} pages/sec  "
+                  f"({baseline / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark of per-request prompt setup overhead
+
+Compares what the graph nodes used to do on every request (llm.bind_tools and
+rebuilding the ~5 KB system prompt) with the objects now built once in
+setup_conversational_chain. Uses a real ChatOpenAI client; nothing is sent.
+
+Usage:
+    python -m benchmarks.bench_prompt_overhead --iterations 2000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import timeit
+
+from langchain.chat_models import init_chat_model
+from langchain_core.messages import HumanMessage, SystemMessage
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import rag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    rag.llm = init_chat_model("gpt-4o-mini", model_provider="openai")
+    with contextlib.redirect_stdout(io.StringIO()):
+        tools = rag.create_retrieval_tools()
+    context = "**RETRIEVED FLIGHTAWARE KNOWLEDGE BASE:**\n" + "Source: https://www.flightaware.com/\nContent: ...\n" * 20
+    question = HumanMessage("What is AeroAPI?")
+
+    def per_request():
+        bound = rag.llm.bind_tools(tools)
+        prompt = [SystemMessage(rag.get_system_prompt() + "\n\n" + context), question]
+        return bound, prompt
+
+    bound_once = rag.llm.bind_tools(tools)
+    static_prompt = SystemMessage(rag.get_system_prompt())
+
+    def built_once():
+        prompt = [static_prompt, SystemMessage(context), question]
+        return bound_once, prompt
+
+    for label, func in (("bind_tools + prompt per request", per_request), ("built once at startup", built_once)):
+        seconds = timeit.timeit(func, number=args.iterations)
+        print(f"{label:32s} {seconds / args.iterations * 1e6:8.1f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
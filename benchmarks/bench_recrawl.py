@@ -0,0 +1,66 @@
+"""
+Re-crawl benchmark: conditional requests against a local fixture site
+
+Crawls the fixture site once with a state file, edits a few pages, then
+re-crawls. The re-crawl sends If-None-Match/If-Modified-Since, gets 304s for
+unchanged pages and parses only the edited ones; the output flags which
+pages changed so the indexer can skip the rest.
+
+Usage:
+    python -m benchmarks.bench_recrawl --pages 60 --edited 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraping"))
+
+from flightaware_scraper import FlightAwareScraper
+
+from benchmarks.fixture_site import edit_pages, start_fixture_site
+
+
+def crawl(base_url: str, pages: int, output: str, state: str, concurrency: int):
+    scraper = FlightAwareScraper(base_urls=[f"{base_url}/page/0"], max_pages=pages,
+                                 allowed_domains=[urlparse(base_url).netloc],
+                                 output_filename=output, state_filename=state)
+    start = time.perf_counter()
+    asyncio.run(scraper.ascrape(concurrency=concurrency, requests_per_second=0))
+    return scraper, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--edited", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--page-kb", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    app, base_url = start_fixture_site(pages=args.pages, latency=args.latency, page_kb=args.page_kb)
+    workdir = tempfile.mkdtemp()
+    output = os.path.join(workdir, "flightaware_data.jsonl")
+    state = os.path.join(workdir, "crawl_state.sqlite")
+
+    for label in ("first crawl", "re-crawl"):
+        if label == "re-crawl":
+            edit_pages(app, range(1, args.edited + 1))
+        app.state.not_modified = 0
+        scraper, elapsed = crawl(base_url, args.pages, output, state, args.concurrency)
+        with open(output, "r", encoding="utf-8") as f:
+            changed = sum(1 for line in f if json.loads(line).get("changed"))
+        print(f"{label:12s} {elapsed:6.2f}s  parsed {scraper.pages_parsed:3d}  unchanged {scraper.pages_unchanged:3d}  "
+              f"304s {app.state.not_modified:3d}  flagged changed {changed:3d}/{scraper.pages_collected}")
+
+
+if __name__ == "__main__":
+    main()
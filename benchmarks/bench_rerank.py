@@ -0,0 +1,102 @@
+"""
+Precision at small k with and without the local feature re-ranker
+
+Builds a local FAISS index (LexicalEmbeddings, see bench_mmr) and the BM25
+index over the chunks JSONPineconeManager produces from the scraped data.
+For each query a chunk counts as relevant when its URL contains the page the
+query is about. Compares precision@k of dense top-k, hybrid fusion top-k,
+and FeatureReranker over RERANK_CANDIDATES fused candidates, and times the
+re-ranker alone.
+
+Usage:
+    python -m benchmarks.bench_rerank --k 5 --candidates 40
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+from vector_database_manager import JSONPineconeManager
+
+from benchmarks.fakes import LexicalEmbeddings
+from retrieval import BM25Index, FeatureReranker, document_key, fuse_documents
+
+# (query, URL fragment of the pages that answer it)
+LABELED_QUERIES = [
+    ("Firehose connection and commands", "/firehose/documentation"),
+    ("How does Foresight predict arrival times?", "/foresight"),
+    ("Premium account features", "/premium"),
+    ("GADSS distress tracking", "/gadss"),
+    ("Aireon space-based ADS-B", "/aireon"),
+    ("What is MLAT multilateration?", "/mlat"),
+    ("Denver airport KDEN departures", "/KDEN"),
+    ("Heathrow EGLL arrivals", "/EGLL"),
+    ("FBO Toolbox", "/fbotoolbox"),
+    ("Custom reports", "/customreports"),
+    ("FlightAware Aviator", "/aviator"),
+    ("GlobalBeacon flight monitoring", "/globalbeacon"),
+    ("Where does FlightAware data come from?", "/datasources"),
+]
+
+
+def precision(docs, fragment: str) -> float:
+    return sum(fragment.lower() in doc.metadata.get("url", "").lower() for doc in docs) / max(len(docs), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    documents = JSONPineconeManager(args.json_file, "flightaware-data", connect_pinecone=False).json_to_documents()
+    store = FAISS.from_documents(documents, LexicalEmbeddings(), normalize_L2=True,
+                                 distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT)
+    keyword_index = BM25Index(documents)
+    reranker = FeatureReranker()
+
+    totals = {"dense": 0.0, "hybrid": 0.0, "rerank": 0.0}
+    rerank_seconds = 0.0
+    print(f"{'query':42s} {'dense':>6s} {'hybrid':>6s} {'rerank':>6s}")
+    for query, fragment in LABELED_QUERIES:
+        dense_hits = store.similarity_search_with_score(query, k=args.candidates)
+        dense_docs = [doc for doc, _ in dense_hits]
+        dense_scores = {document_key(doc): float(score) for doc, score in dense_hits}
+        keyword_docs = [doc for doc, _ in keyword_index.search(query, k=args.candidates)]
+        pool = fuse_documents(dense_docs, keyword_docs, limit=args.candidates)
+        pool_scores = [dense_scores.get(document_key(doc)) for doc in pool]
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            scores = reranker(query, pool, pool_scores)
+        rerank_seconds += (time.perf_counter() - start) / args.iterations
+        reranked = [pool[i] for i in np.argsort(-scores, kind="stable")[:args.k]]
+
+        row = {
+            "dense": precision(dense_docs[:args.k], fragment),
+            "hybrid": precision(pool[:args.k], fragment),
+            "rerank": precision(reranked, fragment),
+        }
+        for name, value in row.items():
+            totals[name] += value
+        print(f"{query[:42]:42s} {row['dense']:6.2f} {row['hybrid']:6.2f} {row['rerank']:6.2f}")
+
+    n = len(LABELED_QUERIES)
+    print(f"\nMean precision@{args.k}: dense {totals['dense'] / n:.2f}, hybrid {totals['hybrid'] / n:.2f}, "
+          f"rerank {totals['rerank'] / n:.2f}")
+    print(f"Re-ranker latency over {args.candidates} candidates: {rerank_seconds / n * 1e3:.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
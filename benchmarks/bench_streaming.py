@@ -0,0 +1,78 @@
+"""
+Time-to-first-token benchmark for POST /chat/stream against a fake chat model
+
+Starts the API on a local port with the fake LLM/vector store and compares the
+time until the first SSE token arrives with the time until /chat returns.
+
+Usage:
+    python -m benchmarks.bench_streaming --llm-delay 0.3 --token-delay 0.02
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.fakes import setup_fake_rag_system
+
+
+def start_server(app) -> str:
+    """Run the app with uvicorn in a background thread and return its base URL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def measure_stream(client: httpx.Client, user_id: str):
+    """Return (time to first token, total time) for one streamed request"""
+    start = time.perf_counter()
+    first_token = None
+    with client.stream("POST", "/chat/stream", json={"user_id": user_id, "query": "What is AeroAPI?", "use_agent": False}) as response:
+        for line in response.iter_lines():
+            if first_token is None and line == "event: token":
+                first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    setup_fake_rag_system(llm_delay=args.llm_delay, token_delay=args.token_delay)
+    import app as app_module
+    app_module.system_initialized = True
+    base_url = start_server(app_module.app)
+
+    ttft, stream_total, blocking_total = [], [], []
+    with httpx.Client(base_url=base_url, timeout=None) as client, contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.runs):
+            first, total = measure_stream(client, f"stream{i}")
+            ttft.append(first)
+            stream_total.append(total)
+            start = time.perf_counter()
+            client.post("/chat", json={"user_id": f"blocking{i}", "query": "What is AeroAPI?", "use_agent": False})
+            blocking_total.append(time.perf_counter() - start)
+
+    print(f"POST /chat         first byte = full answer: {statistics.median(blocking_total) * 1000:7.1f} ms")
+    print(f"POST /chat/stream  time to first token:      {statistics.median(ttft) * 1000:7.1f} ms")
+    print(f"POST /chat/stream  full answer:              {statistics.median(stream_total) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
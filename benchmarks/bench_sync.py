@@ -0,0 +1,78 @@
+"""
+Chunks an incremental sync would embed and delete after typical re-scrapes
+
+Indexes the scraped data into a manifest, then diffs fresh chunkings of
+edited copies against it, the way sync_vector_store does: the same pages in
+another order (what a re-crawl writes), the data as JSONL, one new page
+prepended, and one page retitled. Reordering or renaming the file must not
+re-key any chunk.
+
+Usage:
+    python -m benchmarks.bench_sync
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector-store"))
+
+from index_manifest import IndexManifest, chunk_ids_by_page
+from vector_database_manager import JSONPineconeManager, iter_json_records
+
+
+def chunk_pages(path: Path) -> dict:
+    documents = JSONPineconeManager(str(path), "flightaware-data", connect_pinecone=False).json_to_documents()
+    return chunk_ids_by_page(documents)[1]
+
+
+def write_jsonl(records, path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json-file", default="scraping/flightaware_data.json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    workdir = Path(tempfile.mkdtemp())
+    records = list(iter_json_records(Path(args.json_file)))
+    manifest = IndexManifest(workdir / "manifest.json", "flightaware-data", "benchmark")
+    manifest.save(chunk_pages(Path(args.json_file)))
+
+    shuffled = records[:]
+    random.Random(args.seed).shuffle(shuffled)
+    new_page = {"url": "https://www.flightaware.com/new-page", "title": "New page",
+                "content": "A page discovered on the re-crawl. " * 40, "metadata": {}}
+    retitled = [dict(records[0], title=f"{records[0].get('title', '')} (updated)")] + records[1:]
+    scenarios = {
+        "reordered": write_jsonl(shuffled, workdir / "reordered.jsonl"),
+        "as JSONL": write_jsonl(records, workdir / "flightaware_data.jsonl"),
+        "new page": write_jsonl([new_page] + records, workdir / "new_page.jsonl"),
+        "retitled": write_jsonl(retitled, workdir / "retitled.jsonl"),
+    }
+
+    print(f"{len(manifest.chunk_ids())} chunks indexed from {len(records)} pages\n")
+    print(f"{'re-scrape':12s} {'added':>6s} {'removed':>8s} {'unchanged':>10s}")
+    results = {}
+    for label, path in scenarios.items():
+        results[label] = changes = manifest.diff(chunk_pages(path))
+        print(f"{label:12s} {len(changes['added']):6d} {len(changes['removed']):8d} {changes['unchanged']:10d}")
+
+    assert not results["reordered"]["added"] and not results["reordered"]["removed"], "reordering re-keyed chunks"
+    assert not results["as JSONL"]["added"] and not results["as JSONL"]["removed"], "renaming re-keyed chunks"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Local fakes for benchmarking the RAG pipeline without OpenAI or Pinecone
+
+- FakeChatModel: chat model with an injected per-call (and per-token) delay
+- FakeVectorStore: in-memory store with an injected per-search delay
+- FakeEmbeddings / FakeIndex: embedding API and Pinecone index with request
+  latency and a requests-per-second limit answered with 429 errors
+- LexicalEmbeddings: hashed bag-of-words vectors, so overlapping chunks are
+  close in vector space like they are with a real embedding model
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_ANSWER = (
+    "FlightAware tracks flights globally by combining ADS-B receivers, "
+    "satellite data and airline feeds into a single real-time picture."
+)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that sleeps instead of calling OpenAI
+
+    When tools are bound and the last message is from the user it answers with
+    a tool call for the first tool, otherwise it returns a fixed answer.
+    """
+
+    delay: float = 0.2
+    token_delay: float = 0.0
+    answer: str = DEFAULT_ANSWER
+    tool_names: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        names = [getattr(t, "name", str(t)) for t in tools]
+        return self.model_copy(update={"tool_names": names})
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.tool_names and messages and messages[-1].type == "human":
+            return AIMessage(content="", tool_calls=[{
+                "name": self.tool_names[0],
+                "args": {"query": messages[-1].content},
+                "id": f"call_{uuid.uuid4().hex[:8]}",
+            }])
+        return AIMessage(content=self.answer)
+
+    def _tokens(self, message: AIMessage) -> List[str]:
+        return [word + " " for word in message.content.split(" ")] if message.content else []
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        reply = self._reply(messages)
+        time.sleep(self.delay + self.token_delay * len(self._tokens(reply)))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        reply = self._reply(messages)
+        await asyncio.sleep(self.delay + self.token_delay * len(self._tokens(reply)))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any):
+        time.sleep(self.delay)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": 0}
+                for tc in reply.tool_calls
+            ]))
+            return
+        for token in self._tokens(reply):
+            time.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any):
+        await asyncio.sleep(self.delay)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": 0}
+                for tc in reply.tool_calls
+            ]))
+            return
+        for token in self._tokens(reply):
+            await asyncio.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class FakeVectorStore:
+    """In-memory stand-in for PineconeVectorStore.similarity_search"""
+
+    def __init__(self, documents: Optional[List[Document]] = None, delay: float = 0.05):
+        self.delay = delay
+        self.documents = documents or [
+            Document(
+                page_content=f"Title: FlightAware page {i}\n\nContent: AeroAPI and Firehose deliver flight data.",
+                metadata={"url": f"https://www.flightaware.com/page{i}/", "title": f"FlightAware page {i}", "record_index": i},
+            )
+            for i in range(10)
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        time.sleep(self.delay)
+        return self.documents[:k]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs):
+        time.sleep(self.delay)
+        return [(doc, 1.0 - i * 0.05) for i, doc in enumerate(self.documents[:k])]
+
+
+class FakeRateLimitError(Exception):
+    """Stand-in for openai.RateLimitError / a Pinecone 429"""
+    status_code = 429
+
+
+class RequestLimiter:
+    """Fixed-window requests-per-second limit shared by concurrent callers"""
+
+    def __init__(self, requests_per_second: Optional[float]):
+        self.requests_per_second = requests_per_second
+        self._lock = threading.Lock()
+        self._window = 0
+        self._count = 0
+
+    def check(self):
+        if not self.requests_per_second:
+            return
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._count = window, 0
+            self._count += 1
+            if self._count > self.requests_per_second:
+                raise FakeRateLimitError("429 Too Many Requests")
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings with per-request and per-text latency"""
+
+    def __init__(self, size: int = 3072, delay: float = 0.3, per_text_delay: float = 0.002,
+                 requests_per_second: Optional[float] = None):
+        self.size = size
+        self.delay = delay
+        self.per_text_delay = per_text_delay
+        self.limiter = RequestLimiter(requests_per_second)
+        self.requests = 0
+        self.texts_embedded = 0
+        self._lock = threading.Lock()
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "little")
+        return np.random.default_rng(seed).standard_normal(self.size, dtype=np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.limiter.check()
+        time.sleep(self.delay + self.per_text_delay * len(texts))
+        with self._lock:
+            self.requests += 1
+            self.texts_embedded += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class LexicalEmbeddings(Embeddings):
+    """Instant embeddings from hashed word counts (L2-normalized)"""
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            vector[int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "little") % self.size] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text)
+
+
+class FakeIndex:
+    """In-memory stand-in for a Pinecone Index (upsert/fetch/delete/list)"""
+
+    def __init__(self, delay: float = 0.15, requests_per_second: Optional[float] = None):
+        self.delay = delay
+        self.limiter = RequestLimiter(requests_per_second)
+        self.vectors: Dict[str, Dict[str, Any]] = {}
+        self.upserts = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None, **kwargs):
+        self.limiter.check()
+        time.sleep(self.delay)
+        with self._lock:
+            self.upserts += 1
+            for record in vectors:
+                self.vectors[record["id"]] = record
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        time.sleep(self.delay)
+        with self._lock:
+            for vector_id in ids:
+                self.vectors.pop(vector_id, None)
+
+    def list(self, namespace: Optional[str] = None, **kwargs):
+        ids = sorted(self.vectors)
+        for start in range(0, len(ids), 100):
+            yield ids[start:start + 100]
+
+    def describe_index_stats(self):
+        return {"total_vector_count": len(self.vectors)}
+
+
+def setup_fake_rag_system(llm_delay: float = 0.2, search_delay: float = 0.05, token_delay: float = 0.0,
+                          graph_mode: Optional[str] = None):
+    """Point rag's globals at the fakes and build the graphs exactly as initialize_rag_system does"""
+    import rag
+
+    rag.llm = FakeChatModel(delay=llm_delay, token_delay=token_delay)
+    rag.json_vector_store = FakeVectorStore(delay=search_delay)
+    tools = rag.create_retrieval_tools()
+    rag.setup_conversational_chain(tools, graph_mode)
+    rag.setup_agent(tools)
+    return rag
@@ -0,0 +1,85 @@
+"""
+Local fixture website for crawler benchmarks
+
+Serves N linked pages built from the scraped FlightAware records (title, meta
+tags, nav/header/footer, paragraphs and a data table) with an injected
+response latency, so crawls can be timed without touching flightaware.com.
+Pages carry ETag/Last-Modified headers and answer conditional requests with
+304; edit_pages changes some of them between crawls.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from email.utils import formatdate
+from typing import Iterable, List
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse
+
+from benchmarks.bench_streaming import start_server
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scraping", "flightaware_data.json")
+
+
+def render_page(i: int, pages: int, record: dict, page_kb: int, fanout: int) -> str:
+    """HTML for fixture page i, linking to the next pages of a BFS tree"""
+    links = "".join(f'<li><a href="/page/{(i * fanout + j) % pages}?ref={i}">Page {(i * fanout + j) % pages}</a></li>'
+                    for j in range(1, fanout + 1))
+    nav = "".join(f'<a href="/page/{j}">Section {j}</a> ' for j in range(min(pages, 10)))
+    words = record.get("content", "").split() or ["FlightAware"]
+    paragraphs, rows, size = [], [], 0
+    while size < page_kb * 1024:
+        start = (len(paragraphs) * 97) % len(words)
+        paragraph = " ".join(words[start:start + 120])
+        paragraphs.append(f"<p>{paragraph}</p>")
+        rows.append(f"<tr><td>Flight FA{i}{len(rows)}</td><td>{paragraph[:60]}</td><td>En route</td></tr>")
+        size += 2 * len(paragraph) + 80
+    return (
+        f"<html><head><title>{record.get('title', 'FlightAware')} ({i})</title>"
+        f'<meta name="description" content="Fixture page {i}"><meta property="og:title" content="Page {i}">'
+        "<style>body { font-family: sans-serif; }</style><script>var tracking = 1;</script></head>"
+        f"<body><header><nav>{nav}</nav></header><main><h1>Page {i}</h1>{''.join(paragraphs)}"
+        f"<table>{''.join(rows)}</table><ul>{links}</ul></main><footer>Copyright FlightAware</footer></body></html>"
+    )
+
+
+def build_fixture_app(pages: int = 100, latency: float = 0.1, page_kb: int = 100, fanout: int = 4) -> FastAPI:
+    """FastAPI app serving /page/0 ... /page/{pages - 1}"""
+    with open(DATA_FILE, "r", encoding="utf-8") as f:
+        records: List[dict] = json.load(f)
+    bodies = [render_page(i, pages, records[i % len(records)], page_kb, fanout) for i in range(pages)]
+
+    app = FastAPI()
+    app.state.requests = 0
+    app.state.not_modified = 0
+    app.state.bodies = bodies
+    app.state.last_modified = [formatdate(usegmt=True)] * pages
+
+    @app.get("/page/{i}")
+    async def page(i: int, request: Request):
+        app.state.requests += 1
+        await asyncio.sleep(latency)
+        body = app.state.bodies[i]
+        headers = {"ETag": f'"{hashlib.md5(body.encode("utf-8")).hexdigest()}"',
+                   "Last-Modified": app.state.last_modified[i]}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            app.state.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return HTMLResponse(body, headers=headers)
+
+    return app
+
+
+def edit_pages(app: FastAPI, indices: Iterable[int]):
+    """Change the main content of some pages (new ETag and Last-Modified)"""
+    for i in indices:
+        app.state.bodies[i] = app.state.bodies[i].replace("<main>", "<main><p>Updated FlightAware notice.</p>", 1)
+        app.state.last_modified[i] = formatdate(usegmt=True)
+
+
+def start_fixture_site(pages: int = 100, latency: float = 0.1, page_kb: int = 100, fanout: int = 4):
+    """Start the fixture site on a local port; returns (app, base URL)"""
+    app = build_fixture_app(pages, latency, page_kb, fanout)
+    return app, start_server(app)
@@ -0,0 +1,254 @@
+"""
+In-process caches for the FlightAware RAG pipeline
+
+- QueryEmbeddingCache: normalized query -> embedding, in front of OpenAIEmbeddings
+- SemanticResponseCache: query embedding -> final answer, matched by cosine similarity
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query for cache lookups (case and whitespace insensitive)"""
+    return " ".join(text.split()).casefold()
+
+
+class QueryEmbeddingCache(Embeddings):
+    """
+    LRU/TTL cache of query embeddings wrapped around another Embeddings model
+
+    Only embed_query is cached; document embedding passes straight through.
+    Entries are stored as float32 arrays and the cache is bounded by total
+    bytes (a text-embedding-3-large vector is 3072 floats = 12 KB).
+    """
+
+    def __init__(self, embeddings: Embeddings, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: Optional[float] = 24 * 3600):
+        """
+        Initialize the query embedding cache
+
+        Args:
+            embeddings: Underlying embeddings model (e.g. OpenAIEmbeddings)
+            max_bytes: Upper bound on bytes held by cached vectors and keys
+            ttl_seconds: Entry lifetime in seconds (None disables expiry)
+        """
+        self.embeddings = embeddings
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # normalized query -> (float32 vector, inserted_at, entry bytes)
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped model (e.g. .model)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, inserted_at, size = entry
+                if self.ttl_seconds is None or time.monotonic() - inserted_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector.tolist()
+                # Expired
+                del self._entries[key]
+                self._bytes -= size
+            self.misses += 1
+            return None
+
+    def _store(self, key: str, embedding: List[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        size = vector.nbytes + len(key.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[2]
+            self._entries[key] = (vector, time.monotonic(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        embedding = self.embeddings.embed_query(text)
+        self._store(key, embedding)
+        return embedding
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        embedding = await self.embeddings.aembed_query(text)
+        self._store(key, embedding)
+        return embedding
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def clear(self):
+        """Drop all cached embeddings"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class SemanticResponseCache:
+    """
+    Cache of final answers keyed by query embedding
+
+    A lookup matches the most similar cached question by cosine similarity and
+    returns its answer when the similarity is above the threshold. Entries are
+    tagged with the vector index version and the whole cache is dropped when
+    the index changes (e.g. after a re-upload).
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl_seconds: Optional[float] = 3600):
+        """
+        Initialize the semantic response cache
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Maximum number of cached answers (least recently used evicted)
+            ttl_seconds: Entry lifetime in seconds (None disables expiry)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.index_version: Any = None
+        # Row i of _vectors is the normalized query embedding of _entries[i]
+        self._vectors: Optional[np.ndarray] = None
+        self._entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, index_version: Any):
+        if index_version != self.index_version:
+            self._vectors = None
+            self._entries = []
+            self.index_version = index_version
+
+    def _remove(self, rows: List[int]):
+        removed = set(rows)
+        keep = [i for i in range(len(self._entries)) if i not in removed]
+        self._entries = [self._entries[i] for i in keep]
+        self._vectors = self._vectors[keep] if keep else None
+
+    def _evict_expired(self):
+        if self.ttl_seconds is None:
+            return
+        now = time.monotonic()
+        expired = [i for i, entry in enumerate(self._entries) if now - entry["created_at"] > self.ttl_seconds]
+        if expired:
+            self._remove(expired)
+
+    def lookup(self, embedding: List[float], index_version: Any = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find a cached answer for a semantically equivalent question
+
+        Returns:
+            (entry, similarity) on a hit, otherwise None. The entry holds
+            "response", "source_urls", "data_source" and the original "latency".
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            self._check_version(index_version)
+            self.lookups += 1
+            # Expired answers must not shadow a live match further down the ranking
+            self._evict_expired()
+            if self._vectors is None:
+                return None
+            similarities = self._vectors @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                return None
+            entry = self._entries[best]
+            entry["last_used"] = time.monotonic()
+            self.hits += 1
+            self.latency_saved += entry["latency"]
+            return entry, similarity
+
+    def store(self, embedding: List[float], response: str, source_urls: List[str], data_source: str,
+              latency: float, index_version: Any = None):
+        """Cache the final answer for a question together with the time it took to compute"""
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(index_version)
+            self._evict_expired()
+            if len(self._entries) >= self.max_entries:
+                oldest = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+                self._remove([oldest])
+            self._entries.append({
+                "response": response,
+                "source_urls": list(source_urls),
+                "data_source": data_source,
+                "latency": latency,
+                "created_at": now,
+                "last_used": now,
+            })
+            row = query[np.newaxis, :]
+            self._vectors = row if self._vectors is None else np.vstack([self._vectors, row])
+
+    def invalidate(self):
+        """Drop all cached answers"""
+        with self._lock:
+            self._vectors = None
+            self._entries = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and cumulative latency saved"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "latency_saved_seconds": self.latency_saved,
+            }
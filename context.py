@@ -0,0 +1,243 @@
+"""
+Prompt context building for retrieved FlightAware chunks
+
+Chunks come from RecursiveCharacterTextSplitter with a 200-character overlap,
+so neighbouring hits from the same page repeat text. pack_context groups hits
+by page, stitches chunks whose ends overlap, and fills a token budget with
+one "Source/Title/Data Source" block per page in rank order.
+
+compress_context goes further and keeps only the sentences of those pages
+that score best against the query, within a smaller token budget.
+"""
+
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from retrieval import tokenize
+from token_counter import count_tokens, truncate_to_tokens
+
+# Shortest suffix/prefix match treated as splitter overlap rather than coincidence
+MIN_OVERLAP_CHARS = 30
+# Longest overlap searched for (the splitter's chunk_overlap plus slack)
+MAX_OVERLAP_CHARS = 400
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+# Unpunctuated scraped text (menus, airport lists) is cut into pieces this long
+MAX_SENTENCE_WORDS = 40
+# Weight of the page's dense similarity relative to lexical query coverage (0-1 each)
+DENSE_WEIGHT = 0.3
+
+
+def page_key(doc: Document) -> Any:
+    """Identity of the page a chunk was split from"""
+    return doc.metadata.get("url") or doc.metadata.get("record_index")
+
+
+def format_block(doc: Document, content: str) -> str:
+    """Context block for one page, in the format the system prompt and extract_sources expect"""
+    return (f"Source: {doc.metadata.get('url', 'Unknown')}\n"
+            f"Title: {doc.metadata.get('title', 'Unknown')}\n"
+            f"Data Source: JSON\n"
+            f"Content: {content}")
+
+
+def overlap_length(left: str, right: str) -> int:
+    """Length of the longest suffix of left that is a prefix of right (0 if shorter than MIN_OVERLAP_CHARS)"""
+    if len(left) < MIN_OVERLAP_CHARS or len(right) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = right[:MIN_OVERLAP_CHARS]
+    window_start = max(0, len(left) - MAX_OVERLAP_CHARS)
+    position = left.find(probe, window_start)
+    while position != -1:
+        # Earliest match = longest overlap
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+def stitch_chunks(texts: Sequence[str]) -> List[str]:
+    """
+    Merge chunks of one page into as few non-overlapping segments as possible
+
+    Chunks contained in another are dropped; pairs where one ends with the
+    start of the other are joined with the overlap written once. Segments
+    that do not connect stay separate.
+    """
+    segments: List[str] = []
+    for text in sorted(set(texts), key=len, reverse=True):
+        if not any(text in segment for segment in segments):
+            segments.append(text)
+
+    merged = True
+    while merged and len(segments) > 1:
+        merged = False
+        best = (0, 0, 0)
+        for i, left in enumerate(segments):
+            for j, right in enumerate(segments):
+                if i != j:
+                    length = overlap_length(left, right)
+                    if length > best[0]:
+                        best = (length, i, j)
+        length, i, j = best
+        if length:
+            joined = segments[i] + segments[j][length:]
+            segments = [s for k, s in enumerate(segments) if k not in (i, j)] + [joined]
+            merged = True
+    return segments
+
+
+def group_pages(docs: Sequence[Document]) -> List[Tuple[List[Document], List[str]]]:
+    """Chunks grouped by page in rank order, with each page's stitched segments"""
+    pages: Dict[Any, List[Document]] = {}
+    for doc in docs:
+        pages.setdefault(page_key(doc), []).append(doc)
+    return [(page_docs, stitch_chunks([doc.page_content for doc in page_docs])) for page_docs in pages.values()]
+
+
+def context_with_stats(docs: Sequence[Document], blocks: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """Join page blocks and measure them against one block per retrieved chunk"""
+    context = "\n\n".join(blocks)
+    raw = "\n\n".join(format_block(doc, doc.page_content) for doc in docs)
+    stats = {
+        "pages": len(blocks),
+        "chunks": len(docs),
+        "raw_tokens": count_tokens(raw),
+        "packed_tokens": count_tokens(context),
+    }
+    return context, stats
+
+
+def pack_context(docs: Sequence[Document], token_budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the retrieval context for the prompt
+
+    Args:
+        docs: Retrieved chunks, best first
+        token_budget: Maximum tokens of the packed context
+
+    Returns:
+        (context string, stats with pages, chunks, raw_tokens and packed_tokens)
+    """
+    blocks: List[str] = []
+    used = 0
+    for page_docs, segments in group_pages(docs):
+        content = " ... ".join(segments)
+        block = format_block(page_docs[0], content)
+        separator_tokens = 1 if blocks else 0
+        tokens = count_tokens(block)
+        remaining = token_budget - used - separator_tokens
+        if tokens > remaining:
+            # Fit what is left of the budget with the start of this page; if too little is
+            # left for that, smaller lower-ranked pages may still fit whole
+            header_tokens = count_tokens(format_block(page_docs[0], ""))
+            if remaining - header_tokens < 50:
+                continue
+            block = format_block(page_docs[0], truncate_to_tokens(content, remaining - header_tokens))
+            tokens = count_tokens(block)
+        blocks.append(block)
+        used += tokens + separator_tokens
+
+    return context_with_stats(docs, blocks)
+
+
+def split_sentences(text: str, max_words: int = MAX_SENTENCE_WORDS) -> List[str]:
+    """Sentences of text; unpunctuated runs (menus, lists) are cut every max_words words"""
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), max_words):
+            sentences.append(" ".join(words[start:start + max_words]))
+    return sentences
+
+
+def score_sentences(query: str, sentences: Sequence[str], page_of_sentence: np.ndarray,
+                    page_relevance: np.ndarray) -> np.ndarray:
+    """
+    Relevance of each sentence to the query
+
+    Lexical: share of the query's IDF mass (IDF over the retrieved sentences)
+    the sentence covers. Dense: the query-embedding similarity of the page the
+    sentence came from, scaled to [0, 1] and weighted by DENSE_WEIGHT.
+    """
+    query_terms = sorted(set(tokenize(query)))
+    if query_terms and len(sentences):
+        term_index = {term: i for i, term in enumerate(query_terms)}
+        present = np.zeros((len(sentences), len(query_terms)), dtype=bool)
+        for row, sentence in enumerate(sentences):
+            for term in set(tokenize(sentence)):
+                column = term_index.get(term)
+                if column is not None:
+                    present[row, column] = True
+        idf = np.log1p(len(sentences) / (1.0 + present.sum(axis=0)))
+        lexical = present @ idf / max(float(idf.sum()), 1e-12)
+    else:
+        lexical = np.zeros(len(sentences))
+    return lexical + DENSE_WEIGHT * page_relevance[page_of_sentence]
+
+
+def compress_context(docs: Sequence[Document], query: str, token_budget: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the retrieval context from the sentences most relevant to the query
+
+    Pages are grouped and stitched as in pack_context, split into sentences,
+    and the best-scoring sentences are kept until token_budget content tokens
+    are used. Kept sentences stay in page order; gaps are marked with "...".
+    Scoring is local: lexical overlap plus the dense score retrieval stored
+    in metadata["score"], so no extra embedding calls are made.
+
+    Args:
+        docs: Retrieved chunks, best first
+        query: Search query
+        token_budget: Maximum content tokens kept across pages
+
+    Returns:
+        (context string, pack_context stats plus sentences, kept_sentences and compression_ratio)
+    """
+    pages = group_pages(docs)
+    sentences: List[str] = []
+    page_of_sentence: List[int] = []
+    for page, (_, segments) in enumerate(pages):
+        for segment in segments:
+            for sentence in split_sentences(segment):
+                sentences.append(sentence)
+                page_of_sentence.append(page)
+    page_of_sentence = np.asarray(page_of_sentence, dtype=np.int64)
+
+    # Page relevance from the dense scores; keyword-only pages get the lowest known score
+    dense = [[doc.metadata.get("score") for doc in page_docs if doc.metadata.get("score") is not None]
+             for page_docs, _ in pages]
+    known = [score for scores in dense for score in scores]
+    floor = min(known) if known else 0.0
+    page_relevance = np.asarray([max(scores) if scores else floor for scores in dense], dtype=np.float64)
+    spread = page_relevance.max() - page_relevance.min() if len(page_relevance) else 0.0
+    page_relevance = (page_relevance - page_relevance.min()) / spread if spread > 0 else np.ones(len(pages))
+
+    scores = score_sentences(query, sentences, page_of_sentence, page_relevance)
+    kept = np.zeros(len(sentences), dtype=bool)
+    used = 0
+    for position in np.argsort(-scores, kind="stable"):
+        tokens = count_tokens(sentences[position])
+        if used + tokens > token_budget:
+            continue
+        kept[position] = True
+        used += tokens
+
+    blocks = []
+    for page, (page_docs, _) in enumerate(pages):
+        positions = np.flatnonzero(kept & (page_of_sentence == page))
+        if not len(positions):
+            continue
+        parts = [sentences[positions[0]]]
+        for previous, position in zip(positions, positions[1:]):
+            parts.append((" " if position == previous + 1 else " ... ") + sentences[position])
+        blocks.append(format_block(page_docs[0], "".join(parts)))
+
+    context, stats = context_with_stats(docs, blocks)
+    stats["sentences"] = len(sentences)
+    stats["kept_sentences"] = int(kept.sum())
+    stats["compression_ratio"] = stats["packed_tokens"] / stats["raw_tokens"] if stats["raw_tokens"] else 1.0
+    return context, stats
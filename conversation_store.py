@@ -0,0 +1,581 @@
+"""
+Conversation checkpoint storage for the FlightAware RAG graphs
+
+- BoundedMemorySaver: MemorySaver with per-thread history caps, idle-thread
+  expiry and a global memory budget with LRU eviction
+- SqliteCheckpointSaver: file-backed checkpointer (SQLite in WAL mode) shared
+  by all uvicorn workers on a host and surviving restarts
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    In-memory checkpointer that keeps memory bounded for long-running workers
+
+    - Only the newest max_checkpoints_per_thread checkpoints of each thread are
+      kept; older checkpoints, their pending writes and channel blobs no longer
+      referenced by a kept checkpoint are dropped.
+    - Threads idle for longer than idle_ttl_seconds are deleted.
+    - When the bytes held exceed max_bytes, least recently used threads are
+      deleted until the budget is met.
+    """
+
+    def __init__(self,
+                 max_checkpoints_per_thread: int = 20,
+                 idle_ttl_seconds: Optional[float] = 6 * 3600,
+                 max_bytes: Optional[int] = 256 * 1024 * 1024,
+                 **kwargs: Any):
+        """
+        Initialize the bounded memory saver
+
+        Args:
+            max_checkpoints_per_thread: Checkpoints retained per thread and namespace
+            idle_ttl_seconds: Delete threads not used for this long (None disables expiry)
+            max_bytes: Global budget for serialized checkpoint data (None disables eviction)
+        """
+        super().__init__(**kwargs)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        # thread_id -> last access time, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        # (thread_id, checkpoint_ns) -> checkpoint_id -> {(channel, version)} referenced
+        self._refs: Dict[Tuple[str, str], Dict[str, Set[Tuple[str, Any]]]] = defaultdict(dict)
+        # thread_id -> blob keys / writes keys owned by the thread
+        self._thread_blobs: Dict[str, Set[tuple]] = defaultdict(set)
+        self._thread_writes: Dict[str, Set[tuple]] = defaultdict(set)
+        self._thread_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self.pruned_checkpoints = 0
+        self.expired_threads = 0
+        self.evicted_threads = 0
+
+    # ------------------------------------------------------------------
+    # Bookkeeping
+    # ------------------------------------------------------------------
+
+    def _touch(self, thread_id: str):
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _measure(self, thread_id: str) -> int:
+        """Recompute the serialized bytes held for one thread"""
+        size = 0
+        for checkpoints in self.storage.get(thread_id, {}).values():
+            for checkpoint, metadata, _ in checkpoints.values():
+                size += len(checkpoint[1]) + len(metadata[1])
+        for key in self._thread_writes.get(thread_id, ()):
+            for _, _, value, _ in self.writes.get(key, {}).values():
+                size += len(value[1])
+        for key in self._thread_blobs.get(thread_id, ()):
+            blob = self.blobs.get(key)
+            if blob is not None:
+                size += len(blob[1])
+        self._total_bytes += size - self._thread_bytes.get(thread_id, 0)
+        self._thread_bytes[thread_id] = size
+        return size
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        """Drop checkpoints beyond the per-thread cap and unreferenced blobs"""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if excess <= 0:
+            return
+        refs = self._refs[(thread_id, checkpoint_ns)]
+        # Checkpoint IDs are time-ordered (uuid6), so the smallest are the oldest
+        for checkpoint_id in sorted(checkpoints)[:excess]:
+            del checkpoints[checkpoint_id]
+            refs.pop(checkpoint_id, None)
+            writes_key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(writes_key, None)
+            self._thread_writes[thread_id].discard(writes_key)
+            self.pruned_checkpoints += 1
+        referenced = set().union(*refs.values()) if refs else set()
+        for key in list(self._thread_blobs[thread_id]):
+            if key[1] == checkpoint_ns and (key[2], key[3]) not in referenced:
+                self.blobs.pop(key, None)
+                self._thread_blobs[thread_id].discard(key)
+
+    def _forget(self, thread_id: str) -> int:
+        """Remove every trace of a thread and return the bytes reclaimed"""
+        reclaimed = self._thread_bytes.pop(thread_id, 0)
+        self._total_bytes -= reclaimed
+        self.storage.pop(thread_id, None)
+        for key in self._thread_writes.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        for key in [key for key in self._refs if key[0] == thread_id]:
+            del self._refs[key]
+        self._last_access.pop(thread_id, None)
+        return reclaimed
+
+    def _enforce_limits(self, current_thread: str):
+        if self.idle_ttl_seconds is not None:
+            self.expired_threads += self.purge_idle(self.idle_ttl_seconds)[0]
+        if self.max_bytes is not None:
+            while self._total_bytes > self.max_bytes and len(self._last_access) > 1:
+                oldest = next(iter(self._last_access))
+                if oldest == current_thread:
+                    break
+                self._forget(oldest)
+                self.evicted_threads += 1
+
+    # ------------------------------------------------------------------
+    # Checkpointer interface
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            result = super().get_tuple(config)
+            thread_id = config["configurable"]["thread_id"]
+            if result is not None:
+                # MemorySaver's defaultdict also creates an (empty) writes entry
+                self._thread_writes[thread_id].add((
+                    thread_id,
+                    result.config["configurable"].get("checkpoint_ns", ""),
+                    result.config["configurable"]["checkpoint_id"],
+                ))
+                self._touch(thread_id)
+            elif thread_id not in self._last_access:
+                # MemorySaver's defaultdict lookup leaves empty entries behind
+                self.storage.pop(thread_id, None)
+            return result
+
+    def put(self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = next_config["configurable"]["thread_id"]
+            checkpoint_ns = next_config["configurable"]["checkpoint_ns"]
+            self._refs[(thread_id, checkpoint_ns)][checkpoint["id"]] = set(checkpoint["channel_versions"].items())
+            self._thread_blobs[thread_id].update((thread_id, checkpoint_ns, k, v) for k, v in new_versions.items())
+            self._prune(thread_id, checkpoint_ns)
+            self._touch(thread_id)
+            self._measure(thread_id)
+            self._enforce_limits(thread_id)
+            return next_config
+
+    def put_writes(self,
+                   config: RunnableConfig,
+                   writes: Sequence[Tuple[str, Any]],
+                   task_id: str,
+                   task_path: str = "") -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            thread_id = config["configurable"]["thread_id"]
+            self._thread_writes[thread_id].add(
+                (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            )
+            self._touch(thread_id)
+            self._measure(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._forget(thread_id)
+
+    # ------------------------------------------------------------------
+    # Maintenance and metrics
+    # ------------------------------------------------------------------
+
+    def thread_bytes(self, thread_id: str) -> int:
+        """Serialized bytes currently held for a thread"""
+        with self._lock:
+            return self._thread_bytes.get(thread_id, 0)
+
+    def purge_idle(self, max_idle_seconds: float) -> Tuple[int, int]:
+        """
+        Delete threads idle for longer than max_idle_seconds
+
+        Returns:
+            (threads deleted, bytes reclaimed)
+        """
+        with self._lock:
+            cutoff = time.monotonic() - max_idle_seconds
+            threads, reclaimed = 0, 0
+            while self._last_access:
+                thread_id, last_access = next(iter(self._last_access.items()))
+                if last_access > cutoff:
+                    break
+                reclaimed += self._forget(thread_id)
+                threads += 1
+            return threads, reclaimed
+
+    def stats(self) -> Dict[str, Any]:
+        """Live threads, bytes held and eviction counters"""
+        with self._lock:
+            return {
+                "backend": "memory",
+                "live_threads": len(self._last_access),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "pruned_checkpoints": self.pruned_checkpoints,
+                "expired_threads": self.expired_threads,
+                "evicted_threads": self.evicted_threads,
+            }
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpointer persisted in a local SQLite database
+
+    The database runs in WAL mode so several worker processes can read and
+    write the same file concurrently. Checkpoints are serialized with the
+    graph serializer (msgpack via ormsgpack), each put/put_writes is a single
+    batched transaction, and only the newest max_checkpoints_per_thread
+    checkpoints of a thread are kept.
+    """
+
+    def __init__(self,
+                 path: str,
+                 max_checkpoints_per_thread: int = 20,
+                 idle_ttl_seconds: Optional[float] = None,
+                 **kwargs: Any):
+        """
+        Initialize the SQLite checkpointer
+
+        Args:
+            path: Database file (created if missing)
+            max_checkpoints_per_thread: Checkpoints retained per thread and namespace
+            idle_ttl_seconds: Delete threads not written for this long (None disables expiry)
+        """
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._lock = threading.Lock()
+        self._last_expiry = 0.0
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata_type TEXT,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS threads (
+                thread_id TEXT PRIMARY KEY,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS threads_last_access ON threads (last_access);
+        """)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _run(self, func, *args):
+        """Run a statement batch inside one transaction"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _load_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self.conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((type_, value))) for task_id, channel, type_, value in rows]
+
+    def _to_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type_, checkpoint, metadata_type, metadata = row
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self.serde.loads_typed((type_, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }}
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=self._load_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def _thread_bytes(self, thread_id: str) -> int:
+        checkpoint_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchone()[0]
+        write_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchone()[0]
+        return checkpoint_bytes + write_bytes
+
+    def _delete_threads(self, thread_ids: List[str]) -> int:
+        reclaimed = 0
+        for thread_id in thread_ids:
+            reclaimed += self._thread_bytes(thread_id)
+        params = [(thread_id,) for thread_id in thread_ids]
+        self.conn.executemany("DELETE FROM checkpoints WHERE thread_id = ?", params)
+        self.conn.executemany("DELETE FROM writes WHERE thread_id = ?", params)
+        self.conn.executemany("DELETE FROM threads WHERE thread_id = ?", params)
+        return reclaimed
+
+    # ------------------------------------------------------------------
+    # Checkpointer interface
+    # ------------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._to_tuple(row) if row else None
+
+    def list(self,
+             config: Optional[RunnableConfig],
+             *,
+             filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None,
+             limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+            results = []
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                checkpoint_tuple = self._to_tuple(row)
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                results.append(checkpoint_tuple)
+        yield from results
+
+    def put(self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, serialized_checkpoint = self.serde.dumps_typed(checkpoint)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        def write():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, serialized_checkpoint, metadata_type, serialized_metadata),
+            )
+            self.conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+            # Prune checkpoints (and their writes) beyond the per-thread cap
+            cutoff = self.conn.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.max_checkpoints_per_thread - 1),
+            ).fetchone()
+            if cutoff:
+                for table in ("checkpoints", "writes"):
+                    self.conn.execute(
+                        f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, cutoff[0]),
+                    )
+
+        self._run(write)
+        self._maybe_expire()
+        return {"configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(self,
+                   config: RunnableConfig,
+                   writes: Sequence[Tuple[str, Any]],
+                   task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, type_, serialized, task_path))
+        # Special writes (negative idx) overwrite, regular writes are only stored once
+        verb = "INSERT OR REPLACE" if all(w[0] in WRITES_IDX_MAP for w in writes) else "INSERT OR IGNORE"
+        self._run(lambda: self.conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows))
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._run(self._delete_threads, [thread_id])
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self,
+                    config: Optional[RunnableConfig],
+                    *,
+                    filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None):
+        results = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in results:
+            yield checkpoint_tuple
+
+    async def aput(self,
+                   config: RunnableConfig,
+                   checkpoint: Checkpoint,
+                   metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self,
+                          config: RunnableConfig,
+                          writes: Sequence[Tuple[str, Any]],
+                          task_id: str,
+                          task_path: str = "") -> None:
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    # Same version format as MemorySaver
+    get_next_version = MemorySaver.get_next_version
+
+    # ------------------------------------------------------------------
+    # Maintenance and metrics
+    # ------------------------------------------------------------------
+
+    def _maybe_expire(self):
+        # Idle expiry is a table scan on the index, run it at most once a minute
+        if self.idle_ttl_seconds is None or time.monotonic() - self._last_expiry < 60:
+            return
+        self._last_expiry = time.monotonic()
+        self.purge_idle(self.idle_ttl_seconds)
+
+    def thread_bytes(self, thread_id: str) -> int:
+        """Serialized bytes currently stored for a thread"""
+        with self._lock:
+            return self._thread_bytes(thread_id)
+
+    def purge_idle(self, max_idle_seconds: float) -> Tuple[int, int]:
+        """
+        Delete threads not written for longer than max_idle_seconds
+
+        Returns:
+            (threads deleted, bytes reclaimed)
+        """
+        def purge():
+            cutoff = time.time() - max_idle_seconds
+            thread_ids = [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM threads WHERE last_access < ?", (cutoff,)
+            )]
+            return len(thread_ids), self._delete_threads(thread_ids)
+
+        return self._run(purge)
+
+    def stats(self) -> Dict[str, Any]:
+        """Live threads, bytes stored and database size"""
+        with self._lock:
+            live_threads = self.conn.execute("SELECT COUNT(*) FROM threads").fetchone()[0]
+            stored = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints"
+            ).fetchone()[0] + self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes"
+            ).fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "live_threads": live_threads,
+            "bytes": stored,
+            "file_bytes": sum(
+                path.stat().st_size
+                for path in (self.path, self.path.with_name(self.path.name + "-wal"))
+                if path.exists()
+            ),
+            "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+        }
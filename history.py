@@ -0,0 +1,174 @@
+"""
+Token-budgeted conversation history for the FlightAware RAG graph
+
+Recent turns are sent verbatim up to a token budget; older turns are folded
+into a running summary kept in the graph state, so prompt size per turn stays
+bounded regardless of session length.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langgraph.graph import MessagesState
+from langgraph.prebuilt.chat_agent_executor import AgentState
+
+from token_counter import count_tokens
+
+# Per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Pronouns and lead-ins that refer back to the previous turn
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|it's|this|these|those|they|them|their|theirs)\b|^\s*(and|what about|how about)\b",
+    re.IGNORECASE,
+)
+FOLLOW_UP_MAX_WORDS = 8
+
+SUMMARY_PROMPT = """Maintain a running summary of a conversation between a user and a FlightAware aviation assistant.
+
+Current summary:
+{summary}
+
+New conversation turns to fold into the summary:
+{turns}
+
+Write the updated summary in at most 150 words. Keep the user's goals, the FlightAware products and facts discussed, and any open questions. Return only the summary."""
+
+
+class ConversationState(MessagesState):
+    """Messages plus the running summary of turns that fell out of the window"""
+    summary: str
+    # ID of the last message folded into the summary
+    summary_message_id: Optional[str]
+
+
+class AgentConversationState(AgentState):
+    """ReAct agent state with the same running summary as ConversationState"""
+    summary: str
+    summary_message_id: Optional[str]
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Tokens a message costs in the prompt"""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def unsummarized_messages(state: ConversationState) -> List[BaseMessage]:
+    """Messages after the last one folded into the summary"""
+    messages = state["messages"]
+    cutoff_id = state.get("summary_message_id")
+    if not cutoff_id:
+        return list(messages)
+    for i, message in enumerate(messages):
+        if message.id == cutoff_id:
+            return list(messages[i + 1:])
+    return list(messages)
+
+
+def is_tool_traffic(message: BaseMessage) -> bool:
+    """Tool results and the AI messages that requested them"""
+    return message.type == "tool" or (message.type == "ai" and bool(getattr(message, "tool_calls", None)))
+
+
+def sent_messages(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """
+    Messages that are actually re-sent to the model
+
+    Tool calls and results of earlier turns are dropped (their retrieved
+    context is only used for the answer it produced); the latest turn is
+    kept whole so an in-progress tool loop sees its own results.
+    """
+    human_positions = [i for i, message in enumerate(messages) if message.type == "human"]
+    latest_turn = human_positions[-1] if human_positions else 0
+    return [message for i, message in enumerate(messages) if i >= latest_turn or not is_tool_traffic(message)]
+
+
+def split_to_budget(messages: Sequence[BaseMessage], budget: int) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    Split messages into (older, recent) so recent fits the token budget
+
+    The recent window always starts at a user message, so tool results are
+    never separated from the tool call that produced them, and always keeps
+    the latest user turn even if it alone exceeds the budget.
+    """
+    total = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        total += message_tokens(messages[i])
+        if total > budget:
+            break
+        start = i
+    # Start the window at a user message so whole turns are kept
+    while start < len(messages) and messages[start].type != "human":
+        start += 1
+    if start == len(messages):
+        # The latest turn alone exceeds the budget: keep it from its user message
+        human_positions = [i for i, message in enumerate(messages) if message.type == "human"]
+        start = human_positions[-1] if human_positions else 0
+    return list(messages[:start]), list(messages[start:])
+
+
+def format_turns(messages: Sequence[BaseMessage]) -> str:
+    """Render user/assistant turns for the summary prompt (tool traffic skipped)"""
+    lines = []
+    for message in messages:
+        if message.type == "human":
+            lines.append(f"User: {message.content}")
+        elif message.type == "ai" and message.content and not getattr(message, "tool_calls", None):
+            lines.append(f"Assistant: {message.content}")
+    return "\n".join(lines)
+
+
+def summary_prompt(summary: str, older: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Prompt that folds older turns into the running summary"""
+    return [HumanMessage(SUMMARY_PROMPT.format(summary=summary or "(none yet)", turns=format_turns(older)))]
+
+
+def summary_message(summary: str) -> List[BaseMessage]:
+    """System message carrying the running summary (empty when there is none)"""
+    if not summary:
+        return []
+    return [SystemMessage(f"**SUMMARY OF EARLIER CONVERSATION:**\n{summary}")]
+
+
+def windowed_messages(state: ConversationState) -> List[BaseMessage]:
+    """Summary message followed by the unsummarized recent turns, without earlier tool traffic"""
+    return summary_message(state.get("summary", "")) + sent_messages(unsummarized_messages(state))
+
+
+def overflow_messages(state: ConversationState, budget: int) -> List[BaseMessage]:
+    """
+    Older turns to fold into the summary, or [] if the window fits the budget
+
+    The budget covers earlier turns only, counting just the messages that are
+    re-sent (see sent_messages); the latest turn is always sent whole. When
+    the window overflows it is summarized down to half the budget, so this
+    runs every few turns rather than every turn.
+    """
+    recent = sent_messages(unsummarized_messages(state))
+    human_positions = [i for i, message in enumerate(recent) if message.type == "human"]
+    earlier = recent[:human_positions[-1]] if human_positions else []
+    if sum(message_tokens(m) for m in earlier) <= budget:
+        return []
+    older, _ = split_to_budget(earlier, budget // 2)
+    return older
+
+
+def condense_query(messages: Sequence[BaseMessage]) -> str:
+    """
+    Build a standalone retrieval query without an LLM call
+
+    The latest user message is used as is unless it looks like a follow-up
+    (at most FOLLOW_UP_MAX_WORDS words and referring back with a pronoun such
+    as "it"/"they" or a lead-in such as "what about"), in which case the
+    previous user message is prepended to carry its topic.
+    """
+    questions = [m.content for m in messages if m.type == "human" and isinstance(m.content, str)]
+    if not questions:
+        return ""
+    latest = questions[-1]
+    if len(questions) > 1 and len(latest.split()) <= FOLLOW_UP_MAX_WORDS and FOLLOW_UP_PATTERN.search(latest):
+        return f"{questions[-2]} {latest}"
+    return latest
@@ -1,49 +1,116 @@
 """
 FlightAware RAG Chatbot - Function-based Implementation
 A specialized RAG implementation for FlightAware flight data using Pinecone vector database
+(or a local FAISS export of it)
 
 Features:
 - Function-based architecture instead of class
-- User-specific memory storage with MemorySaver
+- User-specific memory storage with a bounded, evicting MemorySaver or SQLite
 - Specialized aviation and flight tracking prompts
 - Multi-step retrieval for comprehensive responses
 - Context-aware conversation handling
 """
 
+import asyncio
 import os
+import re
 import time
+import uuid
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+import numpy as np
+
 # LangChain imports
 from langchain.chat_models import init_chat_model
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.tools import tool
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
 
 # LangGraph imports
-from langgraph.graph import MessagesState, StateGraph, END
+from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode, tools_condition, create_react_agent
-from langgraph.checkpoint.memory import MemorySaver
 
 # Pinecone imports
 from pinecone import Pinecone
 
 from dotenv import load_dotenv
 
+from caching import QueryEmbeddingCache, SemanticResponseCache
+from conversation_store import BoundedMemorySaver, SqliteCheckpointSaver
+from retrieval import (
+    RERANKERS, BM25Index, adaptive_cutoff, document_key, fuse_documents, load_chunks, maximal_marginal_relevance
+)
+from context import compress_context, pack_context, page_key
+from history import (
+    AgentConversationState,
+    ConversationState,
+    condense_query,
+    overflow_messages,
+    summary_message,
+    summary_prompt,
+    unsummarized_messages,
+    windowed_messages,
+)
+
 # Load environment variables
 load_dotenv()
 
 # Global variables for models and stores
 llm = None
+llm_with_tools = None
+system_prompt_message = None
 embeddings = None
 json_vector_store = None
 pdf_vector_store = None
 conversational_graph = None
 agent_executor = None
 memory_saver = None
+semantic_cache = None
+keyword_index = None
+reranker = None
+# File whose modification time identifies the current index contents
+index_version_path = None
+
+# Default location of the local FAISS index written by vector_database_manager.py
+DEFAULT_FAISS_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "vector-store", "faiss_index")
+# Pinecone layout written by vector-store/ingestion_pipeline.py: chunk text under metadata["text"], default namespace
+PINECONE_TEXT_KEY = "text"
+PINECONE_NAMESPACE = None
+# Chunks returned per retrieval, and candidates taken from each side before hybrid fusion
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "5"))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+# Candidates re-scored by the local re-ranker (RERANKER) before keeping RETRIEVAL_K
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "40"))
+# Adaptive k: return fewer than RETRIEVAL_K chunks when the dense scores fall off
+ADAPTIVE_K_ENABLED = os.getenv("ADAPTIVE_K_ENABLED", "false").lower() in ("1", "true", "yes")
+MIN_RELEVANCE_SCORE = float(os.getenv("MIN_RELEVANCE_SCORE", "0.0"))
+RELATIVE_SCORE_CUTOFF = float(os.getenv("RELATIVE_SCORE_CUTOFF", "0.8"))
+MAX_SCORE_DROP = float(os.getenv("MAX_SCORE_DROP", "0.1"))
+# Maximal marginal relevance: re-select the dense candidates for diversity before fusion
+MMR_ENABLED = os.getenv("MMR_ENABLED", "false").lower() in ("1", "true", "yes")
+MMR_FETCH_K = int(os.getenv("MMR_FETCH_K", "20"))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))
+# Penalty on chunks of a page MMR already selected, so the selection spreads across pages
+MMR_PAGE_PENALTY = float(os.getenv("MMR_PAGE_PENALTY", "0.1"))
+# Prompt tokens of retrieved context per retrieval (chunks are grouped by page and de-overlapped first)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+# Extractive compression: keep only the sentences most relevant to the query
+CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "false").lower() in ("1", "true", "yes")
+COMPRESSED_CONTEXT_TOKENS = int(os.getenv("COMPRESSED_CONTEXT_TOKENS", "800"))
+# Prompt tokens of verbatim conversation history per LLM call; older turns are summarized
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+# Default SQLite conversation store (CHECKPOINTER=sqlite)
+DEFAULT_CHECKPOINT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "conversations.sqlite")
+
+FALLBACK_GENERATION_MESSAGE = "I'm experiencing some technical difficulties right now. Please try rephrasing your question or visit FlightAware.com for more information."
+STREAM_ERROR_MESSAGE = "I'm experiencing some technical difficulties. Please try again or rephrase your question."
+EMPTY_RESPONSE_MESSAGE = "I'm here to help, but I'm having trouble processing your message right now. Could you please try rephrasing your question?"
 
 def initialize_models(model_name: str = "gpt-4o-mini"):
     """Initialize chat model and embeddings"""
@@ -53,13 +120,36 @@ def initialize_models(model_name: str = "gpt-4o-mini"):
     llm = init_chat_model(model_name, model_provider="openai")
     
     # Initialize embeddings model - using text-embedding-3-large
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    # Repeated questions reuse the cached query embedding instead of a round trip
+    embeddings = QueryEmbeddingCache(
+        OpenAIEmbeddings(model="text-embedding-3-large"),
+        max_bytes=int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "86400"))
+    )
     
     print("✅ Models initialized successfully")
 
-def setup_pinecone_connections(json_index_name: str = "flightaware-data"):
-    """Setup connections to Pinecone vector databases"""
-    global json_vector_store, pdf_vector_store
+def setup_pinecone_connections(json_index_name: str = "flightaware-data",
+                               vector_store_backend: Optional[str] = None,
+                               faiss_index_path: Optional[str] = None):
+    """
+    Setup connections to the vector databases
+    
+    Args:
+        json_index_name: Name of the Pinecone index (also the FAISS index file name)
+        vector_store_backend: "pinecone" (default) or "faiss" for the local index
+            exported by JSONPineconeManager.export_faiss_index; falls back to the
+            VECTOR_STORE_BACKEND environment variable
+        faiss_index_path: Folder holding the FAISS index; falls back to FAISS_INDEX_PATH
+    """
+    global json_vector_store, pdf_vector_store, index_version_path
+    
+    backend = (vector_store_backend or os.getenv("VECTOR_STORE_BACKEND", "pinecone")).lower()
+    if backend == "faiss":
+        setup_faiss_connection(json_index_name, faiss_index_path)
+        return
+    if backend != "pinecone":
+        raise ValueError(f"Unknown vector store backend: {backend} (expected 'pinecone' or 'faiss')")
     
     # Get API key from environment
     api_key = os.getenv("PINECONE_API_KEY")
@@ -84,7 +174,14 @@ def setup_pinecone_connections(json_index_name: str = "flightaware-data"):
         
         json_vector_store = PineconeVectorStore(
             embedding=embeddings,
-            index=json_index
+            index=json_index,
+            text_key=PINECONE_TEXT_KEY,
+            namespace=PINECONE_NAMESPACE
+        )
+        # Re-uploads rewrite the metadata file (JSONPineconeManager.save_metadata)
+        index_version_path = os.getenv(
+            "INDEX_METADATA_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "vector-store", f"json_pinecone_metadata_{json_index_name}.json")
         )
         print(f"✅ Connected to JSON vector store: {json_index_name}")
     except Exception as e:
@@ -92,43 +189,231 @@ def setup_pinecone_connections(json_index_name: str = "flightaware-data"):
         print("💡 Make sure the index exists and has data uploaded")
         json_vector_store = None
 
+def setup_faiss_connection(json_index_name: str = "flightaware-data", faiss_index_path: Optional[str] = None):
+    """Load the on-disk FAISS index and serve similarity_search in-process"""
+    global json_vector_store, index_version_path
+    
+    folder = faiss_index_path or os.getenv("FAISS_INDEX_PATH", DEFAULT_FAISS_INDEX_PATH)
+    
+    try:
+        # The pickle is produced locally by JSONPineconeManager.export_faiss_index
+        json_vector_store = FAISS.load_local(
+            folder,
+            embeddings,
+            index_name=json_index_name,
+            allow_dangerous_deserialization=True,
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        print(f"📊 FAISS index '{json_index_name}' has {json_vector_store.index.ntotal} vectors")
+        index_version_path = os.path.join(folder, f"{json_index_name}.faiss")
+        print(f"✅ Loaded local FAISS vector store: {folder}")
+    except Exception as e:
+        print(f"❌ Could not load FAISS index '{json_index_name}' from {folder}: {e}")
+        print("💡 Build it first with JSONPineconeManager.export_faiss_index()")
+        json_vector_store = None
+
+def setup_keyword_index(json_index_name: str = "flightaware-data",
+                        retrieval_mode: Optional[str] = None,
+                        corpus_path: Optional[str] = None):
+    """
+    Build the in-process BM25 index used for hybrid retrieval
+    
+    The corpus is the FAISS docstore when serving from the local index,
+    otherwise the chunks file written by JSONPineconeManager.export_chunks.
+    
+    Args:
+        json_index_name: Index name (selects the default chunks file)
+        retrieval_mode: "dense" (default) or "hybrid"; falls back to RETRIEVAL_MODE
+        corpus_path: Chunks JSONL file; falls back to BM25_CORPUS_PATH
+    """
+    global keyword_index
+    
+    keyword_index = None
+    mode = (retrieval_mode or os.getenv("RETRIEVAL_MODE", "dense")).lower()
+    if mode == "dense":
+        return
+    if mode != "hybrid":
+        raise ValueError(f"Unknown retrieval mode: {mode} (expected 'hybrid' or 'dense')")
+    
+    try:
+        if isinstance(json_vector_store, FAISS):
+            documents = [json_vector_store.docstore.search(doc_id)
+                         for doc_id in json_vector_store.index_to_docstore_id.values()]
+        else:
+            corpus_path = corpus_path or os.getenv(
+                "BM25_CORPUS_PATH",
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), "vector-store", f"chunks_{json_index_name}.jsonl")
+            )
+            if not os.path.exists(corpus_path):
+                print(f"⚠️ No chunks file at {corpus_path}, using dense retrieval only")
+                print("💡 Write it with JSONPineconeManager.export_chunks()")
+                return
+            documents = load_chunks(corpus_path)
+        keyword_index = BM25Index(documents)
+        print(f"✅ BM25 keyword index built over {len(keyword_index)} chunks (hybrid retrieval)")
+    except Exception as e:
+        print(f"❌ Could not build BM25 keyword index: {e}")
+        keyword_index = None
+
+def setup_reranker(name: Optional[str] = None):
+    """
+    Select the local re-ranking stage
+    
+    Args:
+        name: "none" (default) or a key of retrieval.RERANKERS such as "features";
+            falls back to the RERANKER environment variable
+    """
+    global reranker
+    
+    name = (name or os.getenv("RERANKER", "none")).lower()
+    if name == "none":
+        reranker = None
+        return
+    if name not in RERANKERS:
+        raise ValueError(f"Unknown reranker: {name} (expected 'none' or one of {sorted(RERANKERS)})")
+    reranker = RERANKERS[name]()
+    print(f"✅ Re-ranker '{name}' enabled over {RERANK_CANDIDATES} candidates")
+
+def dense_candidates(query_vector: List[float], k: int):
+    """
+    Nearest chunks to a query embedding, with their scores and stored vectors
+    
+    Args:
+        query_vector: Query embedding
+        k: Number of candidates
+    
+    Returns:
+        Tuple of (Documents, similarity scores, embedding matrix with one row per Document), best first
+    """
+    if isinstance(json_vector_store, FAISS):
+        # The local index stores L2-normalized vectors (inner product = cosine)
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores, positions = json_vector_store.index.search(query[None, :], k)
+        keep = positions[0] >= 0
+        positions, scores = positions[0][keep], scores[0][keep]
+        vectors = np.empty((len(positions), len(query)), dtype=np.float32)
+        for row, position in enumerate(positions):
+            vectors[row] = json_vector_store.index.reconstruct(int(position))
+        docs = [json_vector_store.docstore.search(json_vector_store.index_to_docstore_id[int(p)]) for p in positions]
+        return docs, scores, vectors
+    
+    # Pinecone returns the stored vectors alongside the matches when asked
+    results = json_vector_store.index.query(
+        vector=list(query_vector), top_k=k, include_values=True, include_metadata=True,
+        namespace=PINECONE_NAMESPACE
+    )
+    docs, scores, vectors = [], [], []
+    for match in results["matches"]:
+        metadata = dict(match["metadata"] or {})
+        if PINECONE_TEXT_KEY not in metadata:
+            continue
+        text = metadata.pop(PINECONE_TEXT_KEY)
+        docs.append(Document(id=match.get("id"), page_content=text, metadata=metadata))
+        scores.append(match["score"])
+        vectors.append(match["values"])
+    return docs, np.asarray(scores, dtype=np.float32), np.asarray(vectors, dtype=np.float32).reshape(len(docs), -1)
+
+def search_flightaware(query: str):
+    """
+    Search the FlightAware knowledge base
+    
+    Returns:
+        Tuple of (serialized context for the prompt, retrieved Document objects)
+    """
+    if not json_vector_store:
+        print("⚠️ JSON vector store not available")
+        return "JSON vector store not available", []
+    
+    try:
+        print(f"🔍 Searching JSON vector store for: '{query}'")
+        
+        # The re-ranker and hybrid fusion each need a larger candidate pool than the final k
+        if reranker is not None:
+            pool_size = RERANK_CANDIDATES
+        elif keyword_index is not None:
+            pool_size = HYBRID_CANDIDATES
+        else:
+            pool_size = RETRIEVAL_K
+        
+        if MMR_ENABLED:
+            # Over-fetch with vectors and reorder so near-duplicate chunks drop down the ranking
+            query_vector = embeddings.embed_query(query)
+            candidates, scores, vectors = dense_candidates(query_vector, max(MMR_FETCH_K, pool_size))
+            order = maximal_marginal_relevance(query_vector, vectors, len(candidates), MMR_LAMBDA,
+                                               groups=[page_key(doc) for doc in candidates],
+                                               group_penalty=MMR_PAGE_PENALTY)
+            dense_hits = [(candidates[i], float(scores[i])) for i in order]
+        else:
+            dense_hits = json_vector_store.similarity_search_with_score(query, k=pool_size)
+        dense_scores = {document_key(doc): float(score) for doc, score in dense_hits}
+        
+        limit = RETRIEVAL_K
+        if ADAPTIVE_K_ENABLED:
+            # The dense score curve decides how many chunks the question warrants. Hits below the cut
+            # leave the (possibly MMR-ordered) dense list before fusion or re-ranking pick from it, so
+            # the score gap that sets the cut always separates kept hits from dropped ones
+            ranked = sorted((float(score) for _, score in dense_hits), reverse=True)
+            keep = adaptive_cutoff(ranked, len(ranked), min_score=MIN_RELEVANCE_SCORE,
+                                   relative_score=RELATIVE_SCORE_CUTOFF, max_drop=MAX_SCORE_DROP)
+            if keep:
+                dense_hits = [(doc, score) for doc, score in dense_hits if float(score) >= ranked[keep - 1]]
+            limit = min(RETRIEVAL_K, keep)
+        dense_docs = [doc for doc, _ in dense_hits]
+        
+        candidate_limit = pool_size if reranker is not None else limit
+        if keyword_index is not None:
+            # Hybrid: dense and BM25 candidates merged by reciprocal rank fusion
+            keyword_docs = [doc for doc, _ in keyword_index.search(query, k=max(HYBRID_CANDIDATES, pool_size))]
+            retrieved_docs = fuse_documents(dense_docs, keyword_docs, limit=candidate_limit)
+        else:
+            retrieved_docs = dense_docs[:candidate_limit]
+        
+        if reranker is not None and retrieved_docs:
+            rerank_scores = reranker(query, retrieved_docs, [dense_scores.get(document_key(doc)) for doc in retrieved_docs])
+            retrieved_docs = [retrieved_docs[i] for i in np.argsort(-rerank_scores, kind="stable")[:limit]]
+        
+        # Copies carry the dense similarity score into the tool artifact (None for keyword-only hits)
+        retrieved_docs = [
+            Document(id=doc.id, page_content=doc.page_content,
+                     metadata={**doc.metadata, "score": dense_scores.get(document_key(doc))})
+            for doc in retrieved_docs
+        ]
+        
+        print(f"✅ Retrieved {len(retrieved_docs)} documents from JSON vector store")
+        
+        if not retrieved_docs:
+            print("⚠️ No documents found in JSON vector store for this query")
+            return "No relevant FlightAware data found for this query.", []
+        
+        # Log document titles for debugging
+        for i, doc in enumerate(retrieved_docs, 1):
+            score = doc.metadata["score"]
+            print(f"   Doc {i} ({'keyword' if score is None else f'{score:.3f}'}): "
+                  f"{doc.metadata.get('title', 'Unknown')[:80]}...")
+        
+        if CONTEXT_COMPRESSION_ENABLED:
+            serialized, context_stats = compress_context(retrieved_docs, query, min(COMPRESSED_CONTEXT_TOKENS, CONTEXT_TOKEN_BUDGET))
+            print(f"🗜️ Compressed {context_stats['chunks']} chunks to {context_stats['kept_sentences']}/"
+                  f"{context_stats['sentences']} sentences: {context_stats['raw_tokens']} -> "
+                  f"{context_stats['packed_tokens']} tokens (ratio {context_stats['compression_ratio']:.2f})")
+        else:
+            serialized, context_stats = pack_context(retrieved_docs, CONTEXT_TOKEN_BUDGET)
+            print(f"📦 Packed {context_stats['chunks']} chunks into {context_stats['pages']} page blocks: "
+                  f"{context_stats['raw_tokens']} -> {context_stats['packed_tokens']} tokens")
+        return serialized, retrieved_docs
+    except Exception as e:
+        print(f"❌ Error retrieving FlightAware data: {e}")
+        return f"Error retrieving FlightAware data: {e}", []
+
 def create_retrieval_tools():
     """Create retrieval tools for different data sources"""
     
     @tool(response_format="content_and_artifact")
     def retrieve_flightaware_data(query: str):
         """Retrieve FlightAware flight tracking and aviation data from JSON knowledge base."""
-        if not json_vector_store:
-            print("⚠️ JSON vector store not available")
-            return "JSON vector store not available", []
-        
-        try:
-            print(f"🔍 Searching JSON vector store for: '{query}'")
-            
-            # Use similarity_search_with_score to see actual scores
-            retrieved_docs = json_vector_store.similarity_search(query, k=5)
-            
-            print(f"✅ Retrieved {len(retrieved_docs)} documents from JSON vector store")
-            
-            if not retrieved_docs:
-                print("⚠️ No documents found in JSON vector store for this query")
-                return "No relevant FlightAware data found for this query.", []
-            
-            # Log document titles for debugging
-            for i, doc in enumerate(retrieved_docs, 1):
-                print(f"   Doc {i}: {doc.metadata.get('title', 'Unknown')[:80]}...")
-            
-            serialized = "\n\n".join(
-                (f"Source: {doc.metadata.get('url', 'Unknown')}\n"
-                 f"Title: {doc.metadata.get('title', 'Unknown')}\n"
-                 f"Data Source: JSON\n"
-                 f"Content: {doc.page_content}")
-                for doc in retrieved_docs
-            )
-            return serialized, retrieved_docs
-        except Exception as e:
-            print(f"❌ Error retrieving FlightAware data: {e}")
-            return f"Error retrieving FlightAware data: {e}", []
+        return search_flightaware(query)
     
     tools = [retrieve_flightaware_data]
     print("✅ Retrieval tools setup complete")
@@ -236,30 +521,142 @@ Make every user interaction valuable. Whether they're a developer integrating Ae
 
 Remember: You represent FlightAware's commitment to being "Central to Aviation." Every response should reflect expertise, reliability, and innovation."""
 
-def setup_conversational_chain(tools):
-    """Setup conversational RAG chain with user-specific memory"""
-    global conversational_graph, memory_saver
+def create_checkpointer(backend: Optional[str] = None):
+    """
+    Create the conversation checkpointer shared by the chain and the agent
+    
+    Args:
+        backend: "memory" (default) or "sqlite" for a file-backed store that
+            survives restarts and is shared by all workers on the host; falls
+            back to the CHECKPOINTER environment variable
+    """
+    backend = (backend or os.getenv("CHECKPOINTER", "memory")).lower()
+    idle_ttl_minutes = float(os.getenv("CONVERSATION_IDLE_TTL_MINUTES", "360"))
+    max_checkpoints = int(os.getenv("CONVERSATION_MAX_CHECKPOINTS", "20"))
+    
+    if backend == "sqlite":
+        db_path = os.getenv("CHECKPOINT_DB_PATH", DEFAULT_CHECKPOINT_DB_PATH)
+        print(f"💾 Using SQLite conversation store: {db_path}")
+        return SqliteCheckpointSaver(
+            db_path,
+            max_checkpoints_per_thread=max_checkpoints,
+            idle_ttl_seconds=idle_ttl_minutes * 60 if idle_ttl_minutes > 0 else None
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown checkpointer backend: {backend} (expected 'memory' or 'sqlite')")
+    
+    max_mb = float(os.getenv("CONVERSATION_MEMORY_MAX_MB", "256"))
+    return BoundedMemorySaver(
+        max_checkpoints_per_thread=max_checkpoints,
+        idle_ttl_seconds=idle_ttl_minutes * 60 if idle_ttl_minutes > 0 else None,
+        max_bytes=int(max_mb * 1024 * 1024) if max_mb > 0 else None
+    )
+
+def summarize_overflow(state) -> Dict[str, Any]:
+    """
+    Fold turns that overflow HISTORY_TOKEN_BUDGET into the running summary
+    
+    Returns:
+        State update with the new summary and cutoff message ID ({} when the window fits)
+    """
+    older = overflow_messages(state, HISTORY_TOKEN_BUDGET)
+    if not older:
+        return {}
+    try:
+        summary = llm.invoke(summary_prompt(state.get("summary", ""), older)).content
+    except Exception as e:
+        print(f"Error summarizing conversation history: {e}")
+        return {}
+    return {"summary": summary, "summary_message_id": older[-1].id}
+
+async def asummarize_overflow(state) -> Dict[str, Any]:
+    """Async variant of summarize_overflow"""
+    older = overflow_messages(state, HISTORY_TOKEN_BUDGET)
+    if not older:
+        return {}
+    try:
+        summary = (await llm.ainvoke(summary_prompt(state.get("summary", ""), older))).content
+    except Exception as e:
+        print(f"Error summarizing conversation history: {e}")
+        return {}
+    return {"summary": summary, "summary_message_id": older[-1].id}
+
+def setup_conversational_chain(tools, graph_mode: Optional[str] = None):
+    """
+    Setup conversational RAG chain with user-specific memory
     
-    # Create user-specific memory saver
-    memory_saver = MemorySaver()
+    Args:
+        tools: Retrieval tools
+        graph_mode: "tool_decision" (default) lets the LLM decide whether to call
+            the retrieval tool before generating; "retrieve_first" always
+            retrieves on the (locally condensed) user query and makes a single
+            generation call. Falls back to the RAG_GRAPH_MODE environment variable.
+    """
+    global conversational_graph, memory_saver, llm_with_tools, system_prompt_message
+    
+    graph_mode = (graph_mode or os.getenv("RAG_GRAPH_MODE", "tool_decision")).lower()
+    if graph_mode not in ("tool_decision", "retrieve_first"):
+        raise ValueError(f"Unknown graph mode: {graph_mode} (expected 'tool_decision' or 'retrieve_first')")
+    
+    # Built once per process instead of on every request
+    llm_with_tools = llm.bind_tools(tools)
+    system_prompt_message = SystemMessage(get_system_prompt())
+    
+    # Create user-specific memory saver (bounded in memory, or SQLite on disk)
+    memory_saver = create_checkpointer()
     
     # Create graph builder
-    graph_builder = StateGraph(MessagesState)
+    graph_builder = StateGraph(ConversationState)
+    
+    # Node 0: Keep the verbatim history within HISTORY_TOKEN_BUDGET
+    def manage_history(state: ConversationState):
+        """Roll turns that overflow the token budget into the running summary."""
+        return summarize_overflow(state)
+    
+    async def amanage_history(state: ConversationState):
+        """Async variant of manage_history."""
+        return await asummarize_overflow(state)
     
     # Node 1: Query processing with tools
-    def process_query(state: MessagesState):
+    def process_query(state: ConversationState):
         """Generate tool calls or direct response for aviation queries."""
-        # Normal processing with tools
-        llm_with_tools = llm.bind_tools(tools)
-        response = llm_with_tools.invoke(state["messages"])
+        # Normal processing with tools (model bound once in setup_conversational_chain)
+        response = llm_with_tools.invoke(windowed_messages(state))
+        return {"messages": [response]}
+    
+    async def aprocess_query(state: ConversationState):
+        """Async variant of process_query used by astream/ainvoke."""
+        response = await llm_with_tools.ainvoke(windowed_messages(state))
         return {"messages": [response]}
     
     # Node 2: Tool execution (retrieval)
     tools_node = ToolNode(tools)
     
+    # Node 2 (retrieve_first mode): retrieve directly without a tool-decision LLM call
+    def retrieval_messages(query: str, serialized: str, docs: List[Document]):
+        """Record the retrieval as a tool call/result pair, as the tool path would."""
+        tool_call_id = f"call_{uuid.uuid4().hex[:24]}"
+        tool_name = tools[0].name
+        return {"messages": [
+            AIMessage(content="", tool_calls=[{"name": tool_name, "args": {"query": query}, "id": tool_call_id}]),
+            ToolMessage(content=serialized, artifact=docs, tool_call_id=tool_call_id, name=tool_name),
+        ]}
+    
+    def retrieve_context(state: ConversationState):
+        """Retrieve FlightAware context for the condensed user query."""
+        query = condense_query(unsummarized_messages(state))
+        serialized, docs = search_flightaware(query)
+        return retrieval_messages(query, serialized, docs)
+    
+    async def aretrieve_context(state: ConversationState):
+        """Async variant of retrieve_context (the search itself runs in a worker thread)."""
+        query = condense_query(unsummarized_messages(state))
+        serialized, docs = await asyncio.to_thread(search_flightaware, query)
+        return retrieval_messages(query, serialized, docs)
+    
     # Node 3: Generate expert response using retrieved content
-    def generate_aviation_response(state: MessagesState):
-        """Generate specialized FlightAware response using retrieved context."""
+    def build_generation_prompt(state: ConversationState):
+        """Build the generation prompt from retrieved context and conversation."""
         # Get recent tool messages
         recent_tool_messages = []
         for message in reversed(state["messages"]):
@@ -281,9 +678,10 @@ def setup_conversational_chain(tools):
         else:
             context_prompt = "**No specific retrieved context available - provide general aviation knowledge or direct user to FlightAware resources.**"
         
-        # Filter conversation messages (exclude tool calls)
-        conversation_messages = []
-        for message in state["messages"]:
+        # Filter conversation messages (exclude tool calls); turns older than
+        # the window are represented by the running summary
+        conversation_messages = summary_message(state.get("summary", ""))
+        for message in unsummarized_messages(state):
             if message.type in ("human", "system"):
                 conversation_messages.append(message)
             elif message.type == "ai":
@@ -296,9 +694,17 @@ def setup_conversational_chain(tools):
                     conversation_messages.append(message)
             # Skip tool messages completely
         
-        # Create the prompt with system message
-        system_prompt = get_system_prompt() + "\n\n" + context_prompt
-        prompt = [SystemMessage(system_prompt)] + conversation_messages
+        # The static system prompt leads byte-for-byte identical on every call
+        # and the history follows in order, so the provider's prompt-prefix
+        # cache covers both; the per-turn context goes just before the question
+        context_message = SystemMessage(context_prompt)
+        if conversation_messages and conversation_messages[-1].type == "human":
+            return [system_prompt_message] + conversation_messages[:-1] + [context_message, conversation_messages[-1]]
+        return [system_prompt_message] + conversation_messages + [context_message]
+    
+    def generate_aviation_response(state: ConversationState):
+        """Generate specialized FlightAware response using retrieved context."""
+        prompt = build_generation_prompt(state)
         
         # Generate response
         try:
@@ -306,62 +712,125 @@ def setup_conversational_chain(tools):
             return {"messages": [response]}
         except Exception as e:
             print(f"Error generating response: {e}")
-            # Return a fallback response
-            fallback_response = AIMessage(content="I'm experiencing some technical difficulties right now. Please try rephrasing your question or visit FlightAware.com for more information.")
-            return {"messages": [fallback_response]}
+            return {"messages": [AIMessage(content=FALLBACK_GENERATION_MESSAGE)]}
+    
+    async def agenerate_aviation_response(state: ConversationState):
+        """Async variant of generate_aviation_response used by astream/ainvoke."""
+        prompt = build_generation_prompt(state)
+        
+        try:
+            response = await llm.ainvoke(prompt)
+            return {"messages": [response]}
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return {"messages": [AIMessage(content=FALLBACK_GENERATION_MESSAGE)]}
     
     # Add nodes to graph
-    graph_builder.add_node("process_query", process_query)
-    graph_builder.add_node("tools", tools_node)
-    graph_builder.add_node("generate_response", generate_aviation_response)
-    
-    # Set entry point and edges
-    graph_builder.set_entry_point("process_query")
-    graph_builder.add_conditional_edges(
-        "process_query",
-        tools_condition,
-        {END: END, "tools": "tools"},
-    )
-    graph_builder.add_edge("tools", "generate_response")
+    # Each LLM node carries a sync and an async implementation so the same graph
+    # serves both get_response (stream) and aget_response (astream)
+    graph_builder.add_node("manage_history", RunnableLambda(manage_history, afunc=amanage_history))
+    graph_builder.add_node("generate_response", RunnableLambda(generate_aviation_response, afunc=agenerate_aviation_response))
+    graph_builder.set_entry_point("manage_history")
+    
+    if graph_mode == "retrieve_first":
+        # manage_history -> retrieve -> generate_response: one LLM call per turn
+        graph_builder.add_node("retrieve", RunnableLambda(retrieve_context, afunc=aretrieve_context))
+        graph_builder.add_edge("manage_history", "retrieve")
+        graph_builder.add_edge("retrieve", "generate_response")
+    else:
+        graph_builder.add_node("process_query", RunnableLambda(process_query, afunc=aprocess_query))
+        graph_builder.add_node("tools", tools_node)
+        
+        # Set edges
+        graph_builder.add_edge("manage_history", "process_query")
+        graph_builder.add_conditional_edges(
+            "process_query",
+            tools_condition,
+            {END: END, "tools": "tools"},
+        )
+        graph_builder.add_edge("tools", "generate_response")
     graph_builder.add_edge("generate_response", END)
     
     # Compile with user-specific memory
     conversational_graph = graph_builder.compile(checkpointer=memory_saver)
     
-    print("✅ Conversational RAG chain with user-specific memory setup complete")
+    print(f"✅ Conversational RAG chain ({graph_mode}) with user-specific memory setup complete")
 
 def setup_agent(tools):
     """Setup ReAct agent for complex FlightAware queries"""
     global agent_executor
     
+    def agent_history(state, update: Dict[str, Any]):
+        """Store the summary update and send the summary plus the recent window to the model"""
+        windowed = windowed_messages({**state, **update})
+        return {**update, "llm_input_messages": windowed}
+    
+    def manage_agent_history(state: AgentConversationState):
+        """Keep the agent's history within HISTORY_TOKEN_BUDGET with the same running summary as the graph"""
+        return agent_history(state, summarize_overflow(state))
+    
+    async def amanage_agent_history(state: AgentConversationState):
+        """Async variant of manage_agent_history"""
+        return agent_history(state, await asummarize_overflow(state))
+    
     # Create agent with user-specific memory
     agent_executor = create_react_agent(
         llm, 
         tools, 
-        checkpointer=memory_saver
+        checkpointer=memory_saver,
+        state_schema=AgentConversationState,
+        pre_model_hook=RunnableLambda(manage_agent_history, afunc=amanage_agent_history)
     )
     print("✅ FlightAware RAG agent setup complete")
 
+def setup_semantic_cache(enabled: Optional[bool] = None):
+    """Setup the optional cross-user semantic answer cache (SEMANTIC_CACHE_ENABLED)"""
+    global semantic_cache
+    
+    if enabled is None:
+        enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    if not enabled:
+        semantic_cache = None
+        return
+    
+    semantic_cache = SemanticResponseCache(
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+        ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+    )
+    print(f"✅ Semantic response cache enabled (threshold {semantic_cache.threshold})")
+
 def initialize_rag_system(json_index_name: str = "flightaware-data",
-                         model_name: str = "gpt-4o-mini"):
+                         model_name: str = "gpt-4o-mini",
+                         vector_store_backend: Optional[str] = None,
+                         graph_mode: Optional[str] = None):
     """Initialize the complete RAG system"""
     print("✈️ Initializing FlightAware RAG System...")
     
     # Initialize models
     initialize_models(model_name)
     
-    # Setup Pinecone connections
-    setup_pinecone_connections(json_index_name)
+    # Setup vector store connections (Pinecone or local FAISS)
+    setup_pinecone_connections(json_index_name, vector_store_backend)
+    
+    # Setup keyword index for hybrid retrieval
+    setup_keyword_index(json_index_name)
+    
+    # Setup optional local re-ranker
+    setup_reranker()
     
     # Create retrieval tools
     tools = create_retrieval_tools()
     
     # Setup conversational chain
-    setup_conversational_chain(tools)
+    setup_conversational_chain(tools, graph_mode)
     
     # Setup agent
     setup_agent(tools)
     
+    # Setup optional semantic answer cache
+    setup_semantic_cache()
+    
     print("✅ FlightAware RAG System ready for conversations!")
 
 def get_user_config(user_id: str) -> Dict[str, Any]:
@@ -385,6 +854,196 @@ def detect_data_source_from_response(response_content: str) -> str:
     else:
         return "none"
 
+def new_response_data(message: str, user_id: str, use_agent: bool = False) -> Dict[str, Any]:
+    """Create the response payload skeleton returned by the API"""
+    return {
+        "user_id": user_id,
+        "query": message,
+        "response": "",
+        "mode": "agent" if use_agent else "assistant",
+        "data_source": "none",
+        "source_urls": [],
+        "timestamp": time.time(),
+        "status_code": 200
+    }
+
+def error_response_data(message: str, user_id: str, error: Exception) -> Dict[str, Any]:
+    """Create the payload returned when the pipeline fails unexpectedly"""
+    return {
+        "user_id": user_id,
+        "query": message,
+        "response": f"I apologize, but I encountered an error while processing your message. Please try again. If the problem persists, please contact support.",
+        "error": str(error),
+        "mode": "error",
+        "data_source": "none",
+        "source_urls": [],
+        "timestamp": time.time(),
+        "status_code": 500
+    }
+
+def extract_sources(all_messages: List[Any]) -> Dict[str, Any]:
+    """
+    Analyze tool messages for data sources and source URLs
+    
+    Args:
+        all_messages: Final message list of the conversation thread
+        
+    Returns:
+        Dict with "data_source" and de-duplicated "source_urls"
+    """
+    data_sources_used = set()
+    source_urls = []
+    
+    try:
+        for msg in all_messages:
+            if hasattr(msg, 'type') and msg.type == "tool":
+                if hasattr(msg, 'content') and msg.content:
+                    content = str(msg.content)
+                    
+                    # Detect data source type
+                    if "Data Source: JSON" in content:
+                        data_sources_used.add("json")
+                    if "Data Source: PDF" in content:
+                        data_sources_used.add("pdf")
+                    
+                    # Extract URLs from content
+                    # Look for "Source: <URL>" pattern in the tool message
+                    url_pattern = r'Source:\s*(https?://[^\s\n]+)'
+                    urls_found = re.findall(url_pattern, content)
+                    source_urls.extend(urls_found)
+                
+                # Also check artifact if available (retrieved documents)
+                if hasattr(msg, 'artifact') and msg.artifact:
+                    try:
+                        # artifact contains the original Document objects
+                        for doc in msg.artifact:
+                            if hasattr(doc, 'metadata') and 'url' in doc.metadata:
+                                url = doc.metadata['url']
+                                if url and url != 'Unknown':
+                                    source_urls.append(url)
+                    except Exception as artifact_error:
+                        print(f"Warning: Error extracting URLs from artifact: {artifact_error}")
+    
+    except Exception as e:
+        print(f"Warning: Error analyzing data sources: {e}")
+        # Continue without data source info
+    
+    # Remove duplicate URLs while preserving order
+    unique_urls = []
+    seen = set()
+    for url in source_urls:
+        if url not in seen:
+            seen.add(url)
+            unique_urls.append(url)
+    
+    # Determine data source
+    if len(data_sources_used) > 1:
+        data_source = "both"
+    elif "json" in data_sources_used:
+        data_source = "json"
+    elif "pdf" in data_sources_used:
+        data_source = "pdf"
+    else:
+        data_source = "none"
+    
+    return {"data_source": data_source, "source_urls": unique_urls}
+
+def finalize_response_data(response_data: Dict[str, Any], all_messages: List[Any]) -> Dict[str, Any]:
+    """Fill the answer, data source and source URLs from the final graph state"""
+    if all_messages:
+        response_data["response"] = all_messages[-1].content
+    
+    response_data.update(extract_sources(all_messages))
+    
+    # Fallback response if no response generated
+    if not response_data["response"]:
+        response_data["response"] = EMPTY_RESPONSE_MESSAGE
+        response_data["data_source"] = "none"
+    
+    return response_data
+
+def get_index_version() -> Optional[int]:
+    """Version of the vector index contents used to invalidate cached answers"""
+    try:
+        return os.stat(index_version_path).st_mtime_ns
+    except (TypeError, OSError):
+        return None
+
+def cache_metadata(hit: bool, similarity: Optional[float] = None, latency_saved: float = 0.0) -> Dict[str, Any]:
+    """Semantic cache details reported with each response"""
+    stats = semantic_cache.stats()
+    return {
+        "hit": hit,
+        "similarity": similarity,
+        "latency_saved_ms": round(max(latency_saved, 0.0) * 1000, 1),
+        "hit_rate": stats["hit_rate"],
+    }
+
+def apply_cache_hit(response_data: Dict[str, Any], entry: Dict[str, Any], similarity: float, elapsed: float) -> Dict[str, Any]:
+    """Fill the response payload from a semantic cache entry"""
+    response_data["response"] = entry["response"]
+    response_data["source_urls"] = list(entry["source_urls"])
+    response_data["data_source"] = entry["data_source"]
+    response_data["cache"] = cache_metadata(True, similarity, entry["latency"] - elapsed)
+    return response_data
+
+def cached_turn(message: str, answer: str) -> Dict[str, Any]:
+    """State update that records a cache-served turn in the user's thread"""
+    return {"messages": [HumanMessage(content=message), AIMessage(content=answer)]}
+
+def semantic_cache_lookup(graph, config: Dict[str, Any], message: str, response_data: Dict[str, Any], use_agent: bool):
+    """
+    Serve a first-turn question from the semantic cache
+    
+    Only threads without history are eligible since follow-ups depend on context.
+    
+    Returns:
+        (response_data or None on a miss, query embedding or None if not eligible)
+    """
+    if semantic_cache is None or graph.get_state(config).values.get("messages"):
+        return None, None
+    
+    started = time.perf_counter()
+    query_vector = embeddings.embed_query(message)
+    hit = semantic_cache.lookup(query_vector, get_index_version())
+    if hit is None:
+        return None, query_vector
+    
+    entry, similarity = hit
+    # Keep the thread consistent so follow-up questions see this turn
+    graph.update_state(config, cached_turn(message, entry["response"]), as_node="agent" if use_agent else "generate_response")
+    return apply_cache_hit(response_data, entry, similarity, time.perf_counter() - started), query_vector
+
+async def asemantic_cache_lookup(graph, config: Dict[str, Any], message: str, response_data: Dict[str, Any], use_agent: bool):
+    """Async variant of semantic_cache_lookup"""
+    if semantic_cache is None or (await graph.aget_state(config)).values.get("messages"):
+        return None, None
+    
+    started = time.perf_counter()
+    query_vector = await embeddings.aembed_query(message)
+    hit = semantic_cache.lookup(query_vector, get_index_version())
+    if hit is None:
+        return None, query_vector
+    
+    entry, similarity = hit
+    await graph.aupdate_state(config, cached_turn(message, entry["response"]), as_node="agent" if use_agent else "generate_response")
+    return apply_cache_hit(response_data, entry, similarity, time.perf_counter() - started), query_vector
+
+def semantic_cache_store(query_vector: Optional[List[float]], response_data: Dict[str, Any], latency: float):
+    """Cache a successfully generated first-turn answer"""
+    if query_vector is None:
+        return
+    if response_data["status_code"] == 200 and response_data["response"] not in (EMPTY_RESPONSE_MESSAGE, FALLBACK_GENERATION_MESSAGE):
+        semantic_cache.store(
+            query_vector,
+            response=response_data["response"],
+            source_urls=response_data["source_urls"],
+            data_source=response_data["data_source"],
+            latency=latency,
+            index_version=get_index_version()
+        )
+    response_data["cache"] = cache_metadata(False)
+
 def get_response(message: str, user_id: str, use_agent: bool = False) -> Dict[str, Any]:
     """
     Get response for API endpoint with user-specific memory
@@ -398,133 +1057,143 @@ def get_response(message: str, user_id: str, use_agent: bool = False) -> Dict[st
         Dict with response data including data source information and URLs
     """
     try:
+        started = time.perf_counter()
         config = get_user_config(user_id)
+        response_data = new_response_data(message, user_id, use_agent)
         
-        response_data = {
-            "user_id": user_id,
-            "query": message,
-            "response": "",
-            "mode": "agent" if use_agent else "assistant",
-            "data_source": "none",
-            "source_urls": [],
-            "timestamp": time.time(),
-            "status_code": 200
-        }
+        # Choose between conversational chain or agent
+        graph = agent_executor if use_agent else conversational_graph
         
-        # Store all messages to analyze data sources
-        all_messages = []
+        # First-turn questions may be answered from the semantic cache
+        cached, query_vector = semantic_cache_lookup(graph, config, message, response_data, use_agent)
+        if cached:
+            return cached
         
-        # Choose between conversational chain or agent
         try:
-            if use_agent:
-                # Agent mode
-                events = list(agent_executor.stream(
-                    {"messages": [{"role": "user", "content": message}]},
-                    stream_mode="values",
-                    config=config,
-                ))
-                if events:
-                    last_event = events[-1]
-                    if "messages" in last_event and last_event["messages"]:
-                        response_data["response"] = last_event["messages"][-1].content
-                    all_messages = last_event.get("messages", [])
-            else:
-                # Counselor mode
-                steps = list(conversational_graph.stream(
-                    {"messages": [{"role": "user", "content": message}]},
-                    stream_mode="values",
-                    config=config,
-                ))
-                if steps:
-                    last_step = steps[-1]
-                    if "messages" in last_step and last_step["messages"]:
-                        response_data["response"] = last_step["messages"][-1].content
-                    all_messages = last_step.get("messages", [])
+            steps = list(graph.stream(
+                {"messages": [{"role": "user", "content": message}]},
+                stream_mode="values",
+                config=config,
+            ))
         except Exception as stream_error:
             print(f"Error in conversation stream: {stream_error}")
-            response_data["response"] = "I'm experiencing some technical difficulties. Please try again or rephrase your question."
-            response_data["data_source"] = "none"
+            response_data["response"] = STREAM_ERROR_MESSAGE
             response_data["status_code"] = 500
             return response_data
         
-        # Analyze data sources and extract URLs from tool messages
-        data_sources_used = set()
-        source_urls = []
+        all_messages = steps[-1].get("messages", []) if steps else []
+        finalize_response_data(response_data, all_messages)
+        semantic_cache_store(query_vector, response_data, time.perf_counter() - started)
+        return response_data
         
-        try:
-            for msg in all_messages:
-                if hasattr(msg, 'type') and msg.type == "tool":
-                    if hasattr(msg, 'content') and msg.content:
-                        content = str(msg.content)
-                        
-                        # Detect data source type
-                        if "Data Source: JSON" in content:
-                            data_sources_used.add("json")
-                        if "Data Source: PDF" in content:
-                            data_sources_used.add("pdf")
-                        
-                        # Extract URLs from content
-                        # Look for "Source: <URL>" pattern in the tool message
-                        import re
-                        url_pattern = r'Source:\s*(https?://[^\s\n]+)'
-                        urls_found = re.findall(url_pattern, content)
-                        source_urls.extend(urls_found)
-                    
-                    # Also check artifact if available (retrieved documents)
-                    if hasattr(msg, 'artifact') and msg.artifact:
-                        try:
-                            # artifact contains the original Document objects
-                            for doc in msg.artifact:
-                                if hasattr(doc, 'metadata') and 'url' in doc.metadata:
-                                    url = doc.metadata['url']
-                                    if url and url != 'Unknown':
-                                        source_urls.append(url)
-                        except Exception as artifact_error:
-                            print(f"Warning: Error extracting URLs from artifact: {artifact_error}")
+    except Exception as e:
+        return error_response_data(message, user_id, e)
+
+async def aget_response(message: str, user_id: str, use_agent: bool = False) -> Dict[str, Any]:
+    """
+    Async version of get_response built on the graph's astream
+    
+    LLM calls are awaited and blocking retrieval runs in the executor, so
+    concurrent requests on one event loop overlap instead of queueing.
+    
+    Args:
+        message: User's message
+        user_id: Unique user identifier for conversation threading
+        use_agent: Whether to use agent mode for complex queries
         
-        except Exception as e:
-            print(f"Warning: Error analyzing data sources: {e}")
-            # Continue without data source info
-        
-        # Remove duplicate URLs while preserving order
-        unique_urls = []
-        seen = set()
-        for url in source_urls:
-            if url not in seen:
-                seen.add(url)
-                unique_urls.append(url)
-        
-        response_data["source_urls"] = unique_urls
-        
-        # Determine data source
-        if len(data_sources_used) > 1:
-            response_data["data_source"] = "both"
-        elif "json" in data_sources_used:
-            response_data["data_source"] = "json"
-        elif "pdf" in data_sources_used:
-            response_data["data_source"] = "pdf"
-        else:
-            response_data["data_source"] = "none"
+    Returns:
+        Dict with response data including data source information and URLs
+    """
+    try:
+        started = time.perf_counter()
+        config = get_user_config(user_id)
+        response_data = new_response_data(message, user_id, use_agent)
         
-        # Fallback response if no response generated
-        if not response_data["response"]:
-            response_data["response"] = "I'm here to help, but I'm having trouble processing your message right now. Could you please try rephrasing your question?"
-            response_data["data_source"] = "none"
+        graph = agent_executor if use_agent else conversational_graph
+        cached, query_vector = await asemantic_cache_lookup(graph, config, message, response_data, use_agent)
+        if cached:
+            return cached
         
+        last_step = None
+        try:
+            async for step in graph.astream(
+                {"messages": [{"role": "user", "content": message}]},
+                stream_mode="values",
+                config=config,
+            ):
+                last_step = step
+        except Exception as stream_error:
+            print(f"Error in conversation stream: {stream_error}")
+            response_data["response"] = STREAM_ERROR_MESSAGE
+            response_data["status_code"] = 500
+            return response_data
+        
+        all_messages = last_step.get("messages", []) if last_step else []
+        finalize_response_data(response_data, all_messages)
+        semantic_cache_store(query_vector, response_data, time.perf_counter() - started)
         return response_data
         
     except Exception as e:
-        return {
-            "user_id": user_id,
-            "query": message,
-            "response": f"I apologize, but I encountered an error while processing your message. Please try again. If the problem persists, please contact support.",
-            "error": str(e),
-            "mode": "error",
-            "data_source": "none",
-            "source_urls": [],
-            "timestamp": time.time(),
-            "status_code": 500
-        }
+        return error_response_data(message, user_id, e)
+
+# Graph nodes whose LLM output is the user-facing answer (tool-decision
+# chunks from process_query carry no content and are skipped)
+ANSWER_NODES = {"process_query", "generate_response", "agent"}
+
+async def astream_response(message: str, user_id: str, use_agent: bool = False):
+    """
+    Stream the answer token by token for the SSE endpoint
+    
+    Args:
+        message: User's message
+        user_id: Unique user identifier for conversation threading
+        use_agent: Whether to use agent mode for complex queries
+        
+    Yields:
+        ("token", {"content": str}) for each LLM token as it is produced, then
+        ("done", response_data) with source_urls and data_source
+    """
+    try:
+        started = time.perf_counter()
+        config = get_user_config(user_id)
+        response_data = new_response_data(message, user_id, use_agent)
+        
+        graph = agent_executor if use_agent else conversational_graph
+        cached, query_vector = await asemantic_cache_lookup(graph, config, message, response_data, use_agent)
+        if cached:
+            yield "token", {"content": cached["response"]}
+            yield "done", cached
+            return
+        
+        last_step = None
+        try:
+            async for mode, payload in graph.astream(
+                {"messages": [{"role": "user", "content": message}]},
+                stream_mode=["messages", "values"],
+                config=config,
+            ):
+                if mode == "values":
+                    last_step = payload
+                    continue
+                chunk, metadata = payload
+                if (isinstance(chunk, AIMessage)
+                        and metadata.get("langgraph_node") in ANSWER_NODES
+                        and isinstance(chunk.content, str) and chunk.content):
+                    yield "token", {"content": chunk.content}
+        except Exception as stream_error:
+            print(f"Error in conversation stream: {stream_error}")
+            response_data["response"] = STREAM_ERROR_MESSAGE
+            response_data["status_code"] = 500
+            yield "done", response_data
+            return
+        
+        all_messages = last_step.get("messages", []) if last_step else []
+        finalize_response_data(response_data, all_messages)
+        semantic_cache_store(query_vector, response_data, time.perf_counter() - started)
+        yield "done", response_data
+        
+    except Exception as e:
+        yield "done", error_response_data(message, user_id, e)
 
 def chat_interactive(message: str, user_id: str, use_agent: bool = False):
     """Interactive chat interface for console use"""
@@ -551,14 +1220,59 @@ def chat_interactive(message: str, user_id: str, use_agent: bool = False):
         ):
             step["messages"][-1].pretty_print()
 
+def get_system_stats() -> Dict[str, Any]:
+    """Collect cache and memory metrics for monitoring"""
+    stats = {}
+    if isinstance(embeddings, QueryEmbeddingCache):
+        stats["embedding_cache"] = embeddings.stats()
+    if semantic_cache is not None:
+        stats["semantic_cache"] = semantic_cache.stats()
+    if memory_saver is not None and hasattr(memory_saver, "stats"):
+        stats["conversations"] = memory_saver.stats()
+    return stats
+
 def get_conversation_summary(user_id: str) -> str:
     """Get a summary of the conversation for continuity"""
     return f"Conversation thread: user_{user_id} - FlightAware assistant session"
 
-def clear_conversation(user_id: str):
-    """Clear conversation memory for a user"""
-    print(f"🧹 Cleared conversation memory for user: {user_id}")
-    # The MemorySaver automatically handles user-specific threads
+def clear_conversation(user_id: str) -> Dict[str, Any]:
+    """
+    Clear conversation memory for a user
+    
+    Deletes every checkpoint and pending write of the user's thread.
+    
+    Returns:
+        Dict with the thread_id and bytes_reclaimed
+    """
+    thread_id = get_user_config(user_id)["configurable"]["thread_id"]
+    reclaimed = 0
+    if memory_saver is not None:
+        if hasattr(memory_saver, "thread_bytes"):
+            reclaimed = memory_saver.thread_bytes(thread_id)
+        memory_saver.delete_thread(thread_id)
+    print(f"🧹 Cleared conversation memory for user: {user_id} ({reclaimed} bytes)")
+    return {"thread_id": thread_id, "bytes_reclaimed": reclaimed}
+
+def purge_idle_conversations(idle_minutes: float) -> Dict[str, Any]:
+    """
+    Delete all conversation threads idle for longer than idle_minutes
+    
+    Returns:
+        Dict with threads_cleared and bytes_reclaimed
+    """
+    threads, reclaimed = 0, 0
+    if memory_saver is not None and hasattr(memory_saver, "purge_idle"):
+        threads, reclaimed = memory_saver.purge_idle(idle_minutes * 60)
+    print(f"🧹 Purged {threads} conversations idle for over {idle_minutes} minutes ({reclaimed} bytes)")
+    return {"threads_cleared": threads, "bytes_reclaimed": reclaimed}
+
+async def aclear_conversation(user_id: str) -> Dict[str, Any]:
+    """Async clear_conversation; the checkpoint deletes run in a worker thread"""
+    return await asyncio.to_thread(clear_conversation, user_id)
+
+async def apurge_idle_conversations(idle_minutes: float) -> Dict[str, Any]:
+    """Async purge_idle_conversations; the scan and deletes run in a worker thread"""
+    return await asyncio.to_thread(purge_idle_conversations, idle_minutes)
 
 def interactive_flightaware_chat():
     """Interactive FlightAware chat session"""
@@ -0,0 +1,297 @@
+"""
+Retrieval stages for the FlightAware RAG pipeline
+
+- BM25Index: in-process keyword index over the same chunks as the vector store
+- reciprocal_rank_fusion: merge dense and keyword rankings
+- maximal_marginal_relevance: diverse selection from a dense candidate pool
+- adaptive_cutoff: how many hits a query warrants, from its similarity scores
+- FeatureReranker: CPU-only re-scoring of an enlarged candidate pool
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+# Keeps product names and codes like "ADS-B", "AeroAPI" or "KJFK" as single tokens
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+
+# Rank constant from the original RRF paper; damps the weight of top ranks
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens for keyword scoring"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def document_key(doc: Document) -> Tuple[str, str]:
+    """Identity of a chunk shared by the dense and keyword sides"""
+    return doc.metadata.get("url", ""), doc.page_content
+
+
+def load_chunks(path: str) -> List[Document]:
+    """Load chunks exported by JSONPineconeManager.export_chunks (one JSON object per line)"""
+    documents = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                documents.append(Document(page_content=record["page_content"], metadata=record.get("metadata", {})))
+    return documents
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed set of chunks
+
+    Postings are stored CSR-style (one contiguous slice of doc ids and
+    precomputed BM25 weights per term), so a query is a concatenation of a
+    few slices and one np.bincount.
+    """
+
+    def __init__(self, documents: Sequence[Document], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index
+
+        Args:
+            documents: Chunks to index (row i of the index is documents[i])
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.documents = list(documents)
+        self.vocabulary: Dict[str, int] = {}
+        term_ids, doc_ids, term_freqs = [], [], []
+        doc_lengths = np.zeros(len(self.documents), dtype=np.float32)
+        for doc_id, doc in enumerate(self.documents):
+            counts = Counter(tokenize(doc.page_content))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+                term_freqs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        tf = np.asarray(term_freqs, dtype=np.float32)[order]
+        df = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self._indptr = np.concatenate([[0], np.cumsum(df)])
+
+        n_docs = max(len(self.documents), 1)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_length = float(doc_lengths.mean()) if len(self.documents) else 1.0
+        norm = k1 * (1 - b + b * doc_lengths[self._doc_ids] / max(avg_length, 1.0))
+        self._weights = np.repeat(idf, df) * tf * (k1 + 1) / (tf + norm)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Document, float]]:
+        """
+        Top-k chunks by BM25 score
+
+        Returns:
+            List of (document, score) with score > 0, best first
+        """
+        term_ids = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not term_ids or k <= 0:
+            return []
+        slices = [slice(self._indptr[t], self._indptr[t + 1]) for t in term_ids]
+        scores = np.bincount(
+            np.concatenate([self._doc_ids[s] for s in slices]),
+            weights=np.concatenate([self._weights[s] for s in slices]),
+            minlength=len(self.documents),
+        )
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], k: int = RRF_K) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse several rankings of the same items
+
+    Each item scores sum(1 / (k + rank)) over the rankings it appears in.
+
+    Returns:
+        List of (item, fused score), best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def fuse_documents(*rankings: Sequence[Document], limit: int) -> List[Document]:
+    """Reciprocal rank fusion of ranked Document lists, deduplicated by document_key"""
+    by_key: Dict[Any, Document] = {}
+    keyed_rankings = []
+    for ranking in rankings:
+        keys = []
+        for doc in ranking:
+            key = document_key(doc)
+            by_key.setdefault(key, doc)
+            keys.append(key)
+        keyed_rankings.append(keys)
+    return [by_key[key] for key, _ in reciprocal_rank_fusion(keyed_rankings)[:limit]]
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (zero rows stay zero)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def maximal_marginal_relevance(query_vector: Sequence[float], candidate_vectors: np.ndarray,
+                               k: int, lambda_mult: float = 0.5, groups: Optional[Sequence[Any]] = None,
+                               group_penalty: float = 0.0) -> List[int]:
+    """
+    Select k diverse candidates by maximal marginal relevance
+
+    Each step picks the candidate maximizing
+    lambda_mult * sim(query) - (1 - lambda_mult) * max sim(already selected),
+    with cosine similarities from one candidate-by-candidate matrix product.
+    With groups (e.g. the page of each chunk), candidates whose group already
+    has a selected member also lose group_penalty, so the selection spreads
+    across pages rather than across differently worded chunks of one page.
+
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Candidate embeddings, one row per candidate
+        k: Number of candidates to select
+        lambda_mult: 1 ranks by relevance only, 0 by diversity only
+        groups: Group key of each candidate (None disables the group penalty)
+        group_penalty: Score subtracted from candidates of an already selected group
+
+    Returns:
+        Candidate positions in selection order
+    """
+    vectors = normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    k = min(k, len(vectors))
+    if k <= 0:
+        return []
+    relevance = vectors @ normalize_rows(np.asarray(query_vector, dtype=np.float32))
+    similarity = vectors @ vectors.T
+    if groups is not None and group_penalty:
+        group_ids = np.unique(np.asarray([str(group) for group in groups]), return_inverse=True)[1]
+    else:
+        group_ids = None
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = similarity[selected[0]].copy()
+    penalty = np.zeros(len(vectors), dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    available[selected[0]] = False
+    while len(selected) < k:
+        if group_ids is not None:
+            penalty[group_ids == group_ids[selected[-1]]] = group_penalty
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy - penalty, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
+
+
+def adaptive_cutoff(scores: Sequence[float], k_max: int, min_score: float = float("-inf"),
+                    relative_score: float = 0.0, max_drop: float = float("inf"), min_k: int = 1) -> int:
+    """
+    Number of leading hits worth keeping from best-first similarity scores
+
+    Hits are kept up to k_max and stop at the first one that scores below
+    min_score, below relative_score * the best score, or more than max_drop
+    below the hit before it.
+
+    Args:
+        scores: Similarity scores, best first
+        k_max: Most hits to keep
+        min_score: Absolute score floor
+        relative_score: Fraction of the best score a hit must reach
+        max_drop: Largest score gap allowed between consecutive hits
+        min_k: Fewest hits to keep (if available)
+
+    Returns:
+        Count of hits to keep
+    """
+    scores = np.asarray(scores[:k_max], dtype=np.float64)
+    if not len(scores):
+        return 0
+    keep = (scores >= min_score) & (scores >= relative_score * scores[0])
+    keep[1:] &= (scores[:-1] - scores[1:]) <= max_drop
+    cut = len(scores) if keep.all() else int(np.argmin(keep))
+    return max(cut, min(min_k, len(scores)))
+
+
+class FeatureReranker:
+    """
+    Re-score candidates from title/URL match, query-term overlap and dense score
+
+    Query terms are matched with one compiled regex per query (no full
+    tokenization of the candidates), and the features are combined as NumPy
+    arrays, so a pool of 40 chunks takes about a millisecond. Term
+    weights are IDF within the pool, so terms every candidate shares count
+    little.
+    """
+
+    def __init__(self, title_weight: float = 0.3, overlap_weight: float = 0.4, dense_weight: float = 0.3):
+        """
+        Args:
+            title_weight: Weight of query terms found in the title or URL
+            overlap_weight: Weight of query terms found in the chunk text (saturating term frequency)
+            dense_weight: Weight of the dense similarity, scaled to [0, 1] over the pool
+        """
+        self.title_weight = title_weight
+        self.overlap_weight = overlap_weight
+        self.dense_weight = dense_weight
+
+    def __call__(self, query: str, docs: Sequence[Document], dense_scores: Sequence[Optional[float]]) -> np.ndarray:
+        """
+        Args:
+            query: Search query
+            docs: Candidate chunks
+            dense_scores: Dense similarity of each candidate (None for keyword-only hits)
+
+        Returns:
+            Score of each candidate (higher is better)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        n = len(docs)
+        dense = np.asarray([np.nan if score is None else score for score in dense_scores], dtype=np.float64)
+        known = ~np.isnan(dense)
+        if known.any() and np.ptp(dense[known]) > 0:
+            dense = np.where(known, (dense - np.nanmin(dense)) / np.ptp(dense[known]), 0.0)
+        else:
+            dense = known.astype(np.float64)
+        if not terms or not n:
+            return self.dense_weight * dense
+
+        column = {term: i for i, term in enumerate(terms)}
+        pattern = re.compile(r"(?<![a-z0-9])(" + "|".join(map(re.escape, terms)) + r")(?![a-z0-9])")
+        tf = np.zeros((n, len(terms)))
+        in_title = np.zeros((n, len(terms)), dtype=bool)
+        for row, doc in enumerate(docs):
+            for term, count in Counter(pattern.findall(doc.page_content.lower())).items():
+                tf[row, column[term]] = count
+            heading = f"{doc.metadata.get('title', '')} {doc.metadata.get('url', '')}".lower()
+            for term in set(pattern.findall(heading)):
+                in_title[row, column[term]] = True
+
+        idf = np.log1p(n / (1.0 + np.count_nonzero(tf, axis=0)))
+        idf_total = max(float(idf.sum()), 1e-12)
+        overlap = (tf / (tf + 1.0)) @ idf / idf_total
+        title = in_title @ idf / idf_total
+        return self.title_weight * title + self.overlap_weight * overlap + self.dense_weight * dense
+
+
+# RERANKER values; any callable (query, docs, dense_scores) -> scores can be plugged in
+RERANKERS: Dict[str, Callable[[], Callable]] = {
+    "features": FeatureReranker,
+}
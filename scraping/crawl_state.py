@@ -0,0 +1,187 @@
+"""
+Persistent crawl state for resumable FlightAware crawls.
+
+Every discovered URL is stored in SQLite with its status (queued, done, empty,
+failed) in discovery order, so an interrupted crawl can reload its visited set
+and frontier instead of starting over from the base URLs. Failed URLs go back
+into the frontier on resume until they have failed MAX_ATTEMPTS times.
+
+Pages also keep their HTTP validators (ETag, Last-Modified), body and content
+hashes, links and last extracted record across crawls, so a re-crawl can send
+conditional requests and reuse unchanged pages without parsing them.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+QUEUED = 'queued'
+DONE = 'done'
+EMPTY = 'empty'
+FAILED = 'failed'
+
+# Fetch attempts (across resumes) before a failed URL is given up on
+MAX_ATTEMPTS = 3
+
+
+class CrawlState:
+    """Frontier, visited set and per-URL status of a crawl, stored in SQLite."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the crawl state database.
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # State files from before failed URLs were retried lack the attempts column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}
+        if 'attempts' not in columns:
+            self._conn.execute("ALTER TABLE urls ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS urls_status ON urls (status, seq)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                content_hash TEXT,
+                links TEXT NOT NULL,
+                record TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def reset(self):
+        """Forget the frontier and visited set (start a fresh crawl); page validators are kept."""
+        with self._lock:
+            self._conn.execute("DELETE FROM urls")
+
+    def enqueue(self, urls: Iterable[str]):
+        """Add newly discovered URLs to the frontier (known URLs are ignored)."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+                [(url, QUEUED, now) for url in urls]
+            )
+
+    def complete(self, url: str, status: str, new_links: Iterable[str] = (), error: Optional[str] = None):
+        """
+        Record a processed URL and the links it led to in one transaction.
+
+        Args:
+            url: Processed URL
+            status: DONE, EMPTY or FAILED
+            new_links: URLs discovered on the page
+            error: Error message for failed URLs
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO urls (url, status, error, attempts, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET status = excluded.status, error = excluded.error, "
+                    "attempts = urls.attempts + excluded.attempts, updated_at = excluded.updated_at",
+                    (url, status, error, 1 if status == FAILED else 0, now)
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+                    [(link, QUEUED, now) for link in new_links]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def requeue_failed(self, max_attempts: int) -> int:
+        """
+        Put failed URLs back in the frontier (e.g. after the network dropped mid-crawl).
+
+        Args:
+            max_attempts: URLs that already failed this many times stay failed
+
+        Returns:
+            Number of URLs re-queued
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE urls SET status = ?, updated_at = ? WHERE status = ? AND attempts < ?",
+                (QUEUED, time.time(), FAILED, max_attempts)
+            )
+        return cursor.rowcount
+
+    def frontier(self) -> List[str]:
+        """URLs still to visit, in discovery (BFS) order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls WHERE status = ? ORDER BY seq", (QUEUED,)).fetchall()
+        return [row[0] for row in rows]
+
+    def visited(self) -> Set[str]:
+        """URLs already processed successfully (done or empty)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls WHERE status IN (?, ?)", (DONE, EMPTY)).fetchall()
+        return {row[0] for row in rows}
+
+    def known(self) -> Set[str]:
+        """Every URL discovered so far."""
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM urls").fetchall()
+        return {row[0] for row in rows}
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Validators, hashes, links and record stored for a page by the last crawl."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, body_hash, content_hash, links, record FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'body_hash': row[2],
+            'content_hash': row[3],
+            'links': json.loads(row[4]),
+            'record': json.loads(row[5]),
+        }
+
+    def save_page(self, url: str, etag: Optional[str], last_modified: Optional[str], body_hash: Optional[str],
+                  content_hash: Optional[str], links: List[str], record: Dict[str, Any]):
+        """Store what a re-crawl needs to skip an unchanged page."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, body_hash, content_hash, links, record, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, content_hash, json.dumps(links),
+                 json.dumps(record, ensure_ascii=False), time.time())
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of URLs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -3,15 +3,22 @@ FlightAware Web Scraper
 This module scrapes flight data from FlightAware.com including all accessible sublinks.
 """
 
+import asyncio
+import os
 import requests
+import aiohttp
+import xxhash
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
 import json
-from typing import Set, Dict, List
+from typing import Any, Set, Dict, Iterable, List, Optional, Tuple
 import logging
 from collections import deque
 
+from crawl_state import CrawlState, DONE, EMPTY, FAILED, MAX_ATTEMPTS
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,31 +26,282 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_DOMAINS = ('www.flightaware.com', 'flightaware.com')
+# Default crawl output, read by vector-store/vector_database_manager.py
+DEFAULT_OUTPUT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flightaware_data.jsonl')
+
+
+def resolve_parser(parser: str = 'html.parser') -> str:
+    """
+    BeautifulSoup tree builder to use.
+    
+    Args:
+        parser: 'html.parser', 'lxml' (faster, needs the optional lxml package)
+            or 'auto' for lxml when installed
+            
+    Returns:
+        Name of an available parser
+    """
+    if parser not in ('auto', 'lxml'):
+        return parser
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        if parser == 'lxml':
+            logger.warning("lxml is not installed, falling back to html.parser")
+        return 'html.parser'
+
+
+def extract_link_candidates(soup: BeautifulSoup, current_url: str) -> List[str]:
+    """
+    Absolute, fragment- and query-free URLs of all links on a page.
+    
+    Args:
+        soup: BeautifulSoup object of the page
+        current_url: Current page URL for resolving relative links
+        
+    Returns:
+        List of URLs in page order, without duplicates
+    """
+    links = {}
+    for anchor in soup.find_all('a', href=True):
+        absolute_url = urljoin(current_url, anchor['href'])
+        
+        # Remove fragments and query parameters for deduplication
+        parsed = urlparse(absolute_url)
+        links[f"{parsed.scheme}://{parsed.netloc}{parsed.path}"] = None
+    return list(links)
+
+
+def extract_page_data(soup: BeautifulSoup, url: str) -> Dict:
+    """
+    Extract relevant data from a page.
+    
+    Args:
+        soup: BeautifulSoup object of the page
+        url: URL of the page
+        
+    Returns:
+        Dictionary containing extracted data
+    """
+    if not soup:
+        return {}
+    
+    data = {
+        'url': url,
+        'title': '',
+        'content': '',
+        'metadata': {}
+    }
+    
+    # Extract title
+    title_tag = soup.find('title')
+    if title_tag:
+        data['title'] = title_tag.get_text(strip=True)
+    
+    # Extract main content
+    # Remove script and style elements
+    for script in soup(['script', 'style', 'nav', 'footer', 'header']):
+        script.decompose()
+    
+    # Get text content
+    text_content = soup.get_text(separator=' ', strip=True)
+    data['content'] = ' '.join(text_content.split())  # Clean up whitespace
+    
+    # Extract meta tags
+    meta_tags = soup.find_all('meta')
+    for meta in meta_tags:
+        if meta.get('name'):
+            data['metadata'][meta.get('name')] = meta.get('content', '')
+        elif meta.get('property'):
+            data['metadata'][meta.get('property')] = meta.get('content', '')
+    
+    # Extract flight-specific data if present
+    # This is a placeholder - you may need to adjust based on actual page structure
+    flight_info = {}
+    
+    # Look for flight tables
+    tables = soup.find_all('table')
+    for table in tables:
+        rows = table.find_all('tr')
+        for row in rows:
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 2:
+                key = cells[0].get_text(strip=True)
+                value = cells[1].get_text(strip=True)
+                if key and value:
+                    flight_info[key] = value
+    
+    if flight_info:
+        data['flight_info'] = flight_info
+    
+    return data
+
+
+def parse_page(content: bytes, url: str, parser: str = 'html.parser') -> Tuple[Dict, List[str]]:
+    """
+    Parse a fetched page into its data and outgoing links.
+    
+    Runs in parse worker processes, so it only takes and returns picklable
+    values. Links are collected after extraction, as in the sequential crawl,
+    so links inside nav/header/footer are not followed.
+    
+    Args:
+        content: Raw response body
+        url: URL of the page
+        parser: BeautifulSoup tree builder (see resolve_parser)
+        
+    Returns:
+        Tuple of (page data, candidate link URLs)
+    """
+    soup = BeautifulSoup(content, parser)
+    page_data = extract_page_data(soup, url)
+    return page_data, extract_link_candidates(soup, url)
+
+
+def body_hash(content: bytes) -> str:
+    """Hash of a raw response body."""
+    return xxhash.xxh3_64_hexdigest(content)
+
+
+def record_hash(page_data: Dict) -> str:
+    """Hash of the extracted fields of a page (what the indexer embeds)."""
+    fields = {key: page_data.get(key) for key in ('title', 'content', 'metadata', 'flight_info')}
+    return xxhash.xxh3_64_hexdigest(json.dumps(fields, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+
+
+def conditional_headers(cached: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers from a page's stored validators."""
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    return headers
+
+
+class JSONLWriter:
+    """
+    Appends one JSON record per line as pages are extracted.
+    
+    Each record is flushed to the OS immediately and fsynced every
+    `fsync_every` records or `fsync_interval` seconds, so a crash loses at most
+    the last few pages and memory does not grow with the crawl.
+    """
+    
+    def __init__(self, filename: str, append: bool = False, fsync_every: int = 50, fsync_interval: float = 5.0):
+        """
+        Open the output file.
+        
+        Args:
+            filename: JSONL output path
+            append: Keep existing records (otherwise the file is truncated)
+            fsync_every: Records between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
+        """
+        self.filename = filename
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.records_written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = open(filename, 'a' if append else 'w', encoding='utf-8')
+    
+    def write(self, record: Dict):
+        """Append a record."""
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.records_written += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        """Force written records to disk."""
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class HostRateLimiter:
+    """Spaces out request starts to each host (politeness limit shared by all workers)."""
+    
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+    
+    async def wait(self, url: str):
+        """Sleep until the next request slot for the URL's host."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
 
 class FlightAwareScraper:
-    def __init__(self, base_urls: List[str] = None, max_pages: int = 100):
+    def __init__(self, base_urls: List[str] = None, max_pages: int = 100, delay: float = 1.0,
+                 allowed_domains: Optional[List[str]] = None, parser: str = 'html.parser',
+                 output_filename: Optional[str] = None, state_filename: Optional[str] = None):
         """
         Initialize the FlightAware scraper.
         
         Args:
             base_urls: List of base URLs to start scraping from
             max_pages: Maximum number of pages to scrape (to prevent infinite crawling)
+            delay: Seconds to wait between pages in the sequential crawl
+            allowed_domains: Hosts the crawl may follow links to (defaults to FlightAware)
+            parser: HTML parser backend: 'html.parser', 'lxml' or 'auto' (lxml when installed)
+            output_filename: Stream pages to this JSONL file as they are extracted
+                instead of keeping them in scraped_data
+            state_filename: SQLite file persisting the frontier and visited set,
+                so an interrupted crawl can be resumed, and per-page validators,
+                so a re-crawl only parses pages that changed
         """
         if base_urls is None:
             base_urls = ["https://www.flightaware.com/"]
         self.base_urls = base_urls if isinstance(base_urls, list) else [base_urls]
         self.max_pages = max_pages
+        self.delay = delay
+        self.allowed_domains = set(allowed_domains or DEFAULT_DOMAINS)
+        self.parser = resolve_parser(parser)
+        self.output_filename = output_filename
+        self.writer: Optional[JSONLWriter] = None
+        self.pages_collected = 0
+        self.pages_parsed = 0
+        self.pages_unchanged = 0
+        self.pages_failed = 0
+        self.state = CrawlState(state_filename) if state_filename else None
         self.visited_urls: Set[str] = set()
         self.scraped_data: List[Dict] = []
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            'User-Agent': USER_AGENT
         })
         
     def is_valid_url(self, url: str) -> bool:
         """Check if URL belongs to FlightAware domain."""
         parsed = urlparse(url)
-        return parsed.netloc == 'www.flightaware.com' or parsed.netloc == 'flightaware.com'
+        return parsed.netloc in self.allowed_domains
     
     def get_page_content(self, url: str) -> BeautifulSoup:
         """
@@ -58,7 +316,7 @@ class FlightAwareScraper:
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return BeautifulSoup(response.content, self.parser)
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             return None
@@ -74,22 +332,10 @@ class FlightAwareScraper:
         Returns:
             Set of absolute URLs found on the page
         """
-        links = set()
         if not soup:
-            return links
-            
-        for anchor in soup.find_all('a', href=True):
-            href = anchor['href']
-            absolute_url = urljoin(current_url, href)
-            
-            # Remove fragments and query parameters for deduplication
-            parsed = urlparse(absolute_url)
-            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-            
-            if self.is_valid_url(clean_url) and clean_url not in self.visited_urls:
-                links.add(clean_url)
-                
-        return links
+            return set()
+        return {url for url in extract_link_candidates(soup, current_url)
+                if self.is_valid_url(url) and url not in self.visited_urls}
     
     def extract_page_data(self, soup: BeautifulSoup, url: str) -> Dict:
         """
@@ -102,101 +348,325 @@ class FlightAwareScraper:
         Returns:
             Dictionary containing extracted data
         """
-        if not soup:
-            return {}
-        
-        data = {
-            'url': url,
-            'title': '',
-            'content': '',
-            'metadata': {}
-        }
-        
-        # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            data['title'] = title_tag.get_text(strip=True)
-        
-        # Extract main content
-        # Remove script and style elements
-        for script in soup(['script', 'style', 'nav', 'footer', 'header']):
-            script.decompose()
-        
-        # Get text content
-        text_content = soup.get_text(separator=' ', strip=True)
-        data['content'] = ' '.join(text_content.split())  # Clean up whitespace
-        
-        # Extract meta tags
-        meta_tags = soup.find_all('meta')
-        for meta in meta_tags:
-            if meta.get('name'):
-                data['metadata'][meta.get('name')] = meta.get('content', '')
-            elif meta.get('property'):
-                data['metadata'][meta.get('property')] = meta.get('content', '')
-        
-        # Extract flight-specific data if present
-        # This is a placeholder - you may need to adjust based on actual page structure
-        flight_info = {}
-        
-        # Look for flight tables
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    key = cells[0].get_text(strip=True)
-                    value = cells[1].get_text(strip=True)
-                    if key and value:
-                        flight_info[key] = value
-        
-        if flight_info:
-            data['flight_info'] = flight_info
-        
-        return data
-    
-    def scrape(self) -> List[Dict]:
+        return extract_page_data(soup, url)
+    
+    def add_page(self, page_data: Dict):
+        """Stream a page to the JSONL output, or keep it in scraped_data."""
+        if self.writer:
+            self.writer.write(page_data)
+        else:
+            self.scraped_data.append(page_data)
+        self.pages_collected += 1
+    
+    def open_output(self, append: bool = False):
+        """Open the JSONL writer when streaming output (appending when resuming)."""
+        if self.output_filename and not self.writer:
+            self.writer = JSONLWriter(self.output_filename, append=append)
+    
+    def start_crawl(self, resume: bool = False) -> List[str]:
+        """
+        Initial frontier of a crawl.
+        
+        Args:
+            resume: Continue the crawl saved in the state file
+            
+        Returns:
+            URLs to visit: the saved frontier when resuming, otherwise the base URLs
+        """
+        if self.state is None:
+            if resume:
+                logger.warning("resume=True needs a state_filename, starting a new crawl")
+            return list(self.base_urls)
+        if resume:
+            if not self.output_filename:
+                logger.warning("Resuming without JSONL output: pages scraped before the interruption are not included")
+            self.visited_urls |= self.state.visited()
+            retried = self.state.requeue_failed(MAX_ATTEMPTS)
+            if retried:
+                logger.info(f"Retrying {retried} URLs that failed before the interruption")
+            frontier = self.state.frontier()
+            if frontier or self.visited_urls:
+                logger.info(f"Resuming crawl: {len(self.visited_urls)} URLs visited, {len(frontier)} queued")
+                return frontier
+        self.state.reset()
+        self.state.enqueue(self.base_urls)
+        return list(self.base_urls)
+    
+    @property
+    def pages_fetched(self) -> int:
+        """URLs counted against max_pages (failed fetches are not)."""
+        return len(self.visited_urls) - self.pages_failed
+    
+    def record_result(self, url: str, status: str, links: Iterable[str] = (), error: Optional[str] = None):
+        """Persist a processed URL and its new links to the crawl state."""
+        if status == FAILED:
+            self.pages_failed += 1
+        if self.state:
+            self.state.complete(url, status, links, error)
+    
+    def close_output(self):
+        if self.writer:
+            self.writer.close()
+            logger.info(f"Data saved to {self.output_filename}")
+            self.writer = None
+    
+    def cached_page(self, url: str) -> Optional[Dict]:
+        """What the last crawl stored for a page (None without a state file)."""
+        return self.state.get_page(url) if self.state else None
+    
+    def reuse_page(self, url: str, cached: Dict, headers) -> List[str]:
+        """
+        Re-emit a page that has not changed (304 or identical body) without parsing it.
+        
+        Args:
+            url: Page URL
+            cached: Stored page from cached_page
+            headers: Response headers (refreshed validators)
+            
+        Returns:
+            Candidate link URLs stored for the page
+        """
+        self.state.save_page(url, headers.get('ETag') or cached['etag'],
+                             headers.get('Last-Modified') or cached['last_modified'],
+                             cached['body_hash'], cached['content_hash'], cached['links'], cached['record'])
+        self.pages_unchanged += 1
+        if cached['record'].get('content'):
+            self.add_page(dict(cached['record'], changed=False))
+        return cached['links']
+    
+    def keep_cached_page(self, url: str, cached: Dict) -> List[str]:
+        """
+        Re-emit the last good version of a page whose re-fetch failed.
+        
+        Without it the page would be missing from the output and the indexer's
+        sync would delete its vectors as if the page had been removed.
+        
+        Args:
+            url: Page URL
+            cached: Stored page from cached_page
+            
+        Returns:
+            Candidate link URLs stored for the page, so the crawl still reaches its children
+        """
+        logger.warning(f"Keeping the previously crawled version of {url}")
+        if cached['record'].get('content'):
+            self.add_page(dict(cached['record'], changed=False))
+        return cached['links']
+    
+    def store_page(self, url: str, cached: Optional[Dict], headers, content: bytes, page_data: Dict, links: List[str]):
+        """
+        Save a freshly parsed page, flagging whether its extracted content changed.
+        
+        Args:
+            url: Page URL
+            cached: Stored page from cached_page (None if never crawled)
+            headers: Response headers (ETag / Last-Modified)
+            content: Raw response body
+            page_data: Extracted page data
+            links: Candidate link URLs of the page
+        """
+        self.pages_parsed += 1
+        if self.state:
+            content_hash = record_hash(page_data)
+            self.state.save_page(url, headers.get('ETag'), headers.get('Last-Modified'),
+                                 body_hash(content), content_hash, links, page_data)
+            page_data = dict(page_data, changed=cached is None or cached['content_hash'] != content_hash)
+        if page_data.get('content'):  # Only add if there's content
+            self.add_page(page_data)
+    
+    def scrape(self, resume: bool = False) -> List[Dict]:
         """
         Main scraping method using BFS to crawl the website.
         
+        Args:
+            resume: Continue the crawl saved in the state file instead of starting over
+        
         Returns:
-            List of dictionaries containing scraped data
+            List of dictionaries containing scraped data (empty when streaming to JSONL)
         """
         logger.info(f"Starting scrape of {len(self.base_urls)} URL(s)")
+        frontier = self.start_crawl(resume)
+        self.open_output(append=bool(self.visited_urls))
+        try:
+            self._scrape(frontier)
+        finally:
+            self.close_output()
         
+        logger.info(f"Scraping complete. Collected {self.pages_collected} pages "
+                    f"({self.pages_parsed} parsed, {self.pages_unchanged} unchanged).")
+        return self.scraped_data
+    
+    def _scrape(self, frontier: List[str]):
+        """BFS crawl loop of scrape."""
         # Use BFS for crawling
-        urls_to_visit = deque(self.base_urls)
+        urls_to_visit = deque(frontier)
         
-        while urls_to_visit and len(self.visited_urls) < self.max_pages:
+        while urls_to_visit and self.pages_fetched < self.max_pages:
             current_url = urls_to_visit.popleft()
             
             if current_url in self.visited_urls:
                 continue
             
-            logger.info(f"Scraping ({len(self.visited_urls) + 1}/{self.max_pages}): {current_url}")
+            logger.info(f"Scraping ({self.pages_fetched + 1}/{self.max_pages}): {current_url}")
             
             # Mark as visited
             self.visited_urls.add(current_url)
             
-            # Get page content
-            soup = self.get_page_content(current_url)
+            # Get page content (conditionally when the page was crawled before)
+            cached = self.cached_page(current_url)
+            try:
+                response = self.session.get(current_url, timeout=10, headers=conditional_headers(cached))
+                response.raise_for_status()
+            except requests.RequestException as e:
+                logger.error(f"Error fetching {current_url}: {e}")
+                links = self.keep_cached_page(current_url, cached) if cached else []
+                new_links = {url for url in links if self.is_valid_url(url) and url not in self.visited_urls}
+                urls_to_visit.extend(new_links)
+                self.record_result(current_url, FAILED, new_links, error=str(e))
+                response = None
             
-            if soup:
-                # Extract data from current page
-                page_data = self.extract_page_data(soup, current_url)
-                if page_data.get('content'):  # Only add if there's content
-                    self.scraped_data.append(page_data)
+            if response is not None:
+                if cached and (response.status_code == 304 or body_hash(response.content) == cached['body_hash']):
+                    # Unchanged since the last crawl: skip parsing
+                    links = self.reuse_page(current_url, cached, response.headers)
+                    status = DONE if cached['record'].get('content') else EMPTY
+                else:
+                    # Extract data from current page
+                    page_data, links = parse_page(response.content, current_url, self.parser)
+                    self.store_page(current_url, cached, response.headers, response.content, page_data, links)
+                    status = DONE if page_data.get('content') else EMPTY
                 
                 # Extract links for further crawling
-                new_links = self.extract_links(soup, current_url)
+                new_links = {url for url in links if self.is_valid_url(url) and url not in self.visited_urls}
                 urls_to_visit.extend(new_links)
+                self.record_result(current_url, status, new_links)
             
             # Be polite - don't hammer the server
-            time.sleep(1)
+            time.sleep(self.delay)
+    
+    async def fetch_page(self, session: aiohttp.ClientSession, rate_limiter: HostRateLimiter, url: str,
+                         headers: Optional[Dict[str, str]] = None) -> Optional[Tuple[int, bytes, Any]]:
+        """
+        Fetch a page with the shared session.
         
-        logger.info(f"Scraping complete. Collected {len(self.scraped_data)} pages.")
+        Args:
+            session: aiohttp session (pooled, keep-alive connections)
+            rate_limiter: Per-host politeness limiter
+            url: The URL to fetch
+            headers: Extra request headers (e.g. conditional request validators)
+            
+        Returns:
+            Tuple of (status code, body, response headers), or None on error
+        """
+        await rate_limiter.wait(url)
+        try:
+            async with session.get(url, headers=headers) as response:
+                response.raise_for_status()
+                return response.status, await response.read(), response.headers.copy()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+    
+    async def ascrape(self, concurrency: int = 8, requests_per_second: float = 4.0,
+                      parse_workers: Optional[int] = None, resume: bool = False) -> List[Dict]:
+        """
+        Crawl with concurrent fetches (asyncio/aiohttp).
+        
+        Workers share one connection pool and a per-host rate limit. Parsing
+        and extraction are CPU-bound, so they run in a process pool and the
+        event loop keeps fetching while pages are parsed.
+        
+        Args:
+            concurrency: Maximum fetches in flight
+            requests_per_second: Politeness limit per host (0 disables it)
+            parse_workers: Parser processes (defaults to the CPU count; 0 parses
+                in a single background thread instead)
+            resume: Continue the crawl saved in the state file instead of starting over
+            
+        Returns:
+            List of dictionaries containing scraped data (empty when streaming to JSONL)
+        """
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        logger.info(f"Starting concurrent scrape of {len(self.base_urls)} URL(s) "
+                    f"({concurrency} workers, {requests_per_second:g} req/s per host, "
+                    f"{parse_workers or 'no'} parser processes, {self.parser})")
+        
+        frontier = self.start_crawl(resume)
+        parse_pool: Executor = ProcessPoolExecutor(parse_workers) if parse_workers else ThreadPoolExecutor(1)
+        self.open_output(append=bool(self.visited_urls))
+        try:
+            await self._crawl(frontier, concurrency, requests_per_second, parse_pool)
+        finally:
+            parse_pool.shutdown(cancel_futures=True)
+            self.close_output()
+        
+        logger.info(f"Scraping complete. Collected {self.pages_collected} pages "
+                    f"({self.pages_parsed} parsed, {self.pages_unchanged} unchanged).")
         return self.scraped_data
     
+    async def _crawl(self, frontier: List[str], concurrency: int, requests_per_second: float, parse_pool: Executor):
+        """BFS crawl loop of ascrape."""
+        loop = asyncio.get_running_loop()
+        rate_limiter = HostRateLimiter(requests_per_second)
+        urls_to_visit: asyncio.Queue = asyncio.Queue()
+        enqueued = set(frontier) | self.visited_urls
+        if self.state:
+            enqueued |= self.state.known()
+        for url in frontier:
+            urls_to_visit.put_nowait(url)
+        
+        async def worker():
+            while True:
+                current_url = await urls_to_visit.get()
+                try:
+                    if current_url in self.visited_urls or self.pages_fetched >= self.max_pages:
+                        continue
+                    self.visited_urls.add(current_url)
+                    logger.info(f"Scraping ({self.pages_fetched}/{self.max_pages}): {current_url}")
+                    
+                    cached = self.cached_page(current_url)
+                    fetched = await self.fetch_page(session, rate_limiter, current_url, conditional_headers(cached))
+                    if fetched is None:
+                        links = self.keep_cached_page(current_url, cached) if cached else []
+                        new_links = [link for link in links if self.is_valid_url(link) and link not in enqueued]
+                        enqueued.update(new_links)
+                        for link in new_links:
+                            urls_to_visit.put_nowait(link)
+                        self.record_result(current_url, FAILED, new_links, error="fetch failed")
+                        continue
+                    status_code, content, headers = fetched
+                    
+                    if cached and (status_code == 304 or body_hash(content) == cached['body_hash']):
+                        # Unchanged since the last crawl: skip parsing
+                        links = self.reuse_page(current_url, cached, headers)
+                        status = DONE if cached['record'].get('content') else EMPTY
+                    else:
+                        page_data, links = await loop.run_in_executor(parse_pool, parse_page, content, current_url, self.parser)
+                        self.store_page(current_url, cached, headers, content, page_data, links)
+                        status = DONE if page_data.get('content') else EMPTY
+                    
+                    new_links = [link for link in links if self.is_valid_url(link) and link not in enqueued]
+                    enqueued.update(new_links)
+                    for link in new_links:
+                        urls_to_visit.put_nowait(link)
+                    self.record_result(current_url, status, new_links)
+                except Exception as e:
+                    logger.error(f"Error scraping {current_url}: {e}")
+                    self.record_result(current_url, FAILED, error=str(e))
+                finally:
+                    urls_to_visit.task_done()
+        
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            await urls_to_visit.join()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
     def save_to_json(self, filename: str = 'flightaware_data.json'):
         """
         Save scraped data to a JSON file.
@@ -209,21 +679,38 @@ class FlightAwareScraper:
         logger.info(f"Data saved to {filename}")
 
 
-def scrape_flightaware(base_urls: List[str] = None, max_pages: int = 100, output_filename: str = 'flightaware_data.json') -> List[Dict]:
+def scrape_flightaware(base_urls: List[str] = None, max_pages: int = 100, output_filename: str = DEFAULT_OUTPUT_FILE,
+                       concurrency: int = 1, requests_per_second: float = 4.0, parser: str = 'html.parser',
+                       state_filename: Optional[str] = None, resume: bool = False) -> List[Dict]:
     """
     Main function to scrape FlightAware website.
     
     Args:
         base_urls: List of base URLs to start scraping from
         max_pages: Maximum number of pages to scrape
-        output_filename: Name of the JSON file to save the scraped data
+        output_filename: File to save the scraped data; a .jsonl name (the
+            default) streams each page to disk as it is extracted, a .json name
+            buffers every page and writes one JSON array at the end
+        concurrency: Concurrent fetches (1 keeps the sequential crawl)
+        requests_per_second: Per-host politeness limit of the concurrent crawl
+        parser: HTML parser backend ('html.parser', 'lxml' or 'auto')
+        state_filename: SQLite file persisting the crawl frontier and visited set
+        resume: Continue the crawl saved in state_filename
         
     Returns:
-        List of dictionaries containing scraped data
+        List of dictionaries containing scraped data (empty when streaming to JSONL)
     """
-    scraper = FlightAwareScraper(base_urls=base_urls, max_pages=max_pages)
-    data = scraper.scrape()
-    scraper.save_to_json(filename=output_filename)
+    streaming = output_filename.endswith('.jsonl')
+    scraper = FlightAwareScraper(base_urls=base_urls, max_pages=max_pages, parser=parser,
+                                 output_filename=output_filename if streaming else None,
+                                 state_filename=state_filename)
+    if concurrency > 1:
+        data = asyncio.run(scraper.ascrape(concurrency=concurrency, requests_per_second=requests_per_second,
+                                           resume=resume))
+    else:
+        data = scraper.scrape(resume=resume)
+    if not streaming:
+        scraper.save_to_json(filename=output_filename)
     return data
 
 
@@ -232,5 +719,8 @@ if __name__ == "__main__":
     scraped_data = scrape_flightaware(
         base_urls=["https://www.flightaware.com/"],
         max_pages=500,
-        output_filename='flightaware_data.json'
+        output_filename=DEFAULT_OUTPUT_FILE,
+        concurrency=8,
+        state_filename=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'crawl_state.sqlite'),
+        resume=True
     )
@@ -0,0 +1,44 @@
+"""
+Token counting with tiktoken for prompt budgeting
+
+The encoding is loaded lazily once per process. If it cannot be loaded (e.g.
+no network access to fetch the BPE file), counts fall back to an estimate of
+four characters per token.
+"""
+
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_ENCODING = "o200k_base"  # gpt-4o / gpt-4o-mini
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = DEFAULT_ENCODING):
+    """Return the tiktoken encoding, or None if it is unavailable"""
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"⚠️ tiktoken encoding '{name}' unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,158 @@
+"""
+Persistent, content-addressed embedding cache for ingestion
+
+Embeddings are keyed by (model, xxhash of the chunk text) and stored per model
+as an append-only float32 matrix (vectors.f32, read through np.memmap) plus a
+parallel file of 16-byte key digests (keys.bin). Opening the cache only reads
+the keys; vectors are paged in from disk when a row is looked up.
+"""
+
+import json
+import logging
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import xxhash
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+KEY_BYTES = 16
+
+
+def text_key(text: str) -> bytes:
+    """128-bit content hash of a chunk"""
+    return xxhash.xxh3_128_digest(text.encode("utf-8"))
+
+
+class PersistentEmbeddingCache(Embeddings):
+    """
+    Disk-backed cache in front of embed_documents
+
+    Only document embeddings are cached; embed_query passes straight through.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_dir: str, model_name: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            embeddings: Underlying embeddings model (e.g. OpenAIEmbeddings)
+            cache_dir: Root folder of the cache (one subfolder per model)
+            model_name: Model identifier (defaults to embeddings.model)
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name or getattr(embeddings, "model", type(embeddings).__name__)
+        self.path = Path(cache_dir) / re.sub(r"[^A-Za-z0-9_.-]", "_", self.model_name)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.keys_file = self.path / "keys.bin"
+        self.vectors_file = self.path / "vectors.f32"
+        self.meta_file = self.path / "meta.json"
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+        self.dim: Optional[int] = None
+        if self.meta_file.exists():
+            with open(self.meta_file, "r") as f:
+                self.dim = json.load(f)["dim"]
+        self._rows: Dict[bytes, int] = {}
+        self._row_count = 0
+        if self.dim:
+            keys = self.keys_file.read_bytes() if self.keys_file.exists() else b""
+            vector_bytes = self.vectors_file.stat().st_size if self.vectors_file.exists() else 0
+            # Keep only rows with both a complete key and a complete vector, and cut
+            # anything an interrupted write left behind so both files stay aligned
+            rows = min(len(keys) // KEY_BYTES, vector_bytes // (4 * self.dim))
+            self._truncate(rows)
+            self._rows = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(rows)}
+            self._row_count = rows
+        logger.info(f"Embedding cache for {self.model_name}: {len(self._rows)} vectors in {self.path}")
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped model (e.g. .model)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _truncate(self, rows: int):
+        """Cut keys.bin and vectors.f32 to exactly rows entries"""
+        for path, row_bytes in ((self.keys_file, KEY_BYTES), (self.vectors_file, 4 * self.dim)):
+            if path.exists() and path.stat().st_size != rows * row_bytes:
+                logger.warning(f"Truncating {path} to {rows} rows after an interrupted write")
+                with open(path, "r+b") as f:
+                    f.truncate(rows * row_bytes)
+
+    def _matrix(self) -> np.memmap:
+        """Memory map of all stored rows (re-opened after appends)"""
+        rows = self._row_count
+        if self._vectors is None or self._vectors.shape[0] != rows:
+            self._vectors = np.memmap(self.vectors_file, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._vectors
+
+    def _append(self, keys: List[bytes], vectors: List[List[float]]):
+        if not keys:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+            with open(self.meta_file, "w") as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+        if matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match cache dimension {self.dim}")
+        # Row numbers come from what is on disk, and a failed earlier write is
+        # cut off first, so a key can never point at another text's vector
+        self._truncate(self._row_count)
+        first_row = self._row_count
+        with open(self.vectors_file, "ab") as f:
+            f.write(matrix.tobytes())
+        with open(self.keys_file, "ab") as f:
+            f.write(b"".join(keys))
+        for offset, key in enumerate(keys):
+            self._rows[key] = first_row + offset
+        self._row_count = first_row + len(keys)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [text_key(text) for text in texts]
+        with self._lock:
+            found = {key: self._rows[key] for key in keys if key in self._rows}
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        missing_texts = {key: text for key, text in zip(keys, texts) if key not in found}
+
+        computed: Dict[bytes, List[float]] = {}
+        if missing:
+            vectors = self.embeddings.embed_documents([missing_texts[key] for key in missing])
+            computed = dict(zip(missing, vectors))
+            with self._lock:
+                new = [key for key in missing if key not in self._rows]
+                self._append(new, [computed[key] for key in new])
+
+        with self._lock:
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+            matrix = self._matrix() if found else None
+            return [computed[key] if key in computed else matrix[found[key]].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size on disk"""
+        with self._lock:
+            return {
+                "entries": len(self._rows),
+                "bytes": self.vectors_file.stat().st_size if self.vectors_file.exists() else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,114 @@
+"""
+Local manifest of the chunks indexed in Pinecone
+
+Chunk IDs are derived from the page URL, the chunk text and the page metadata
+that reaches the prompt (title, description, og:title), so the same chunk
+always maps to the same vector and a retitled page gets its vectors rewritten.
+Bookkeeping metadata (record_index, source file, index name) is left out:
+re-crawls write pages in a different order and must not re-key the index, so
+a kept vector keeps the record_index it was first indexed with. The manifest
+records which IDs each page contributed; diffing it against a fresh chunking
+tells which vectors to embed and which to delete.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import xxhash
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Chunk metadata hashed into the chunk ID
+CONTENT_METADATA_KEYS = ("title", "description", "og_title")
+
+
+def chunk_id(url: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Deterministic vector ID: hash of the page URL + hash of the chunk text and its CONTENT_METADATA_KEYS"""
+    content = text
+    if metadata:
+        fields = {key: metadata[key] for key in CONTENT_METADATA_KEYS if metadata.get(key)}
+        if fields:
+            content += "\0" + json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return f"{xxhash.xxh64_hexdigest(url.encode('utf-8'))}-{xxhash.xxh3_128_hexdigest(content.encode('utf-8'))}"
+
+
+def chunk_ids_by_page(documents: Sequence[Document]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Chunk IDs for documents, plus the IDs grouped by page URL
+
+    Returns:
+        (ID of each document, {url: [chunk IDs]})
+    """
+    ids, pages = [], {}
+    for doc in documents:
+        url = doc.metadata.get("url", "Unknown")
+        vector_id = chunk_id(url, doc.page_content, doc.metadata)
+        ids.append(vector_id)
+        pages.setdefault(url, []).append(vector_id)
+    return ids, pages
+
+
+class IndexManifest:
+    """Which chunk IDs are in the index, per page, for one index and embedding model"""
+
+    def __init__(self, path: Path, index_name: str, embedding_model: str, pages: Dict[str, List[str]] = None):
+        self.path = Path(path)
+        self.index_name = index_name
+        self.embedding_model = embedding_model
+        self.pages: Dict[str, List[str]] = pages or {}
+
+    @classmethod
+    def load(cls, path: Path, index_name: str, embedding_model: str) -> "IndexManifest":
+        """Load the manifest, or an empty one if missing or built with another embedding model"""
+        path = Path(path)
+        if not path.exists():
+            return cls(path, index_name, embedding_model)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("embedding_model") != embedding_model:
+            logger.warning(f"Manifest {path} was built with {data.get('embedding_model')}, ignoring it")
+            return cls(path, index_name, embedding_model)
+        return cls(path, index_name, embedding_model, data.get("pages", {}))
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def chunk_ids(self) -> set:
+        return {vector_id for ids in self.pages.values() for vector_id in ids}
+
+    def diff(self, pages: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Compare the indexed pages with a fresh chunking
+
+        Returns:
+            {"added": IDs to embed, "removed": IDs to delete, "unchanged": count,
+             "pages_changed": count, "pages_removed": count}
+        """
+        indexed = self.chunk_ids()
+        current = {vector_id for ids in pages.values() for vector_id in ids}
+        return {
+            "added": current - indexed,
+            "removed": indexed - current,
+            "unchanged": len(current & indexed),
+            "pages_changed": sum(1 for url, ids in pages.items() if set(ids) != set(self.pages.get(url, []))),
+            "pages_removed": sum(1 for url in self.pages if url not in pages),
+        }
+
+    def save(self, pages: Dict[str, List[str]]):
+        """Record the pages now in the index"""
+        self.pages = {url: list(dict.fromkeys(ids)) for url, ids in pages.items()}
+        data = {
+            "index_name": self.index_name,
+            "embedding_model": self.embedding_model,
+            "updated_date": pd.Timestamp.now().isoformat(),
+            "total_chunks": len(self.chunk_ids()),
+            "pages": self.pages,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"Index manifest saved to: {self.path}")
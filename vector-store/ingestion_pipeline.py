@@ -0,0 +1,257 @@
+"""
+Pipelined embedding + upsert stage for JSONPineconeManager
+
+Chunks are grouped into token-bounded batches and embedded by concurrent
+workers. The vectors go through a bounded queue to separate upsert workers, so
+embedding and upserting overlap. A 429 from either side pauses that stage with
+exponential backoff (honoring Retry-After when the error carries it) instead of
+sleeping a fixed time between batches.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# Metadata key PineconeVectorStore reads the chunk text from
+TEXT_KEY = "text"
+
+
+def get_token_counter():
+    """tiktoken counter for OpenAI embedding models, or a chars/4 estimate when unavailable"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception:
+        return lambda text: len(text) // 4 + 1
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for HTTP 429 errors from OpenAI or Pinecone clients"""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After header of a rate-limit error, if present"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class RateLimitBackoff:
+    """
+    Backoff shared by all workers of one stage
+
+    A 429 seen by any worker pauses the whole stage, and the delay doubles for
+    consecutive 429s and resets after a success.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self._failures = 0
+        self.rate_limited = 0
+
+    def wait(self):
+        """Block while the stage is paused"""
+        while True:
+            with self._lock:
+                remaining = self._resume_at - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def record_rate_limit(self, error: Exception):
+        with self._lock:
+            self.rate_limited += 1
+            self._failures += 1
+            delay = retry_after_seconds(error)
+            if delay is None:
+                delay = min(self.max_delay, self.base_delay * 2 ** (self._failures - 1)) * random.uniform(0.75, 1.25)
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        logger.warning(f"Rate limited ({type(error).__name__}), backing off {delay:.1f}s")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+
+class EmbeddingUploadPipeline:
+    """
+    Concurrent embed -> bounded queue -> concurrent upsert
+
+    Vectors are upserted in the PineconeVectorStore layout (chunk text under
+    metadata["text"]), so the index stays readable by PineconeVectorStore.
+    """
+
+    def __init__(self,
+                 embeddings: Embeddings,
+                 index: Any,
+                 embed_workers: int = 4,
+                 upsert_workers: int = 2,
+                 max_batch_tokens: int = 20000,
+                 max_batch_size: int = 256,
+                 upsert_batch_size: int = 100,
+                 queue_size: int = 8,
+                 max_retries: int = 6,
+                 namespace: Optional[str] = None):
+        """
+        Initialize the pipeline
+
+        Args:
+            embeddings: Embeddings model (embed_documents is called per batch)
+            index: Pinecone Index (or any object with upsert(vectors=..., namespace=...))
+            embed_workers: Concurrent embedding requests
+            upsert_workers: Concurrent upsert requests
+            max_batch_tokens: Token budget of one embedding request
+            max_batch_size: Maximum chunks in one embedding request
+            upsert_batch_size: Vectors per upsert request
+            queue_size: Embedded batches buffered ahead of the upsert workers
+            max_retries: Attempts per request after rate limiting
+            namespace: Pinecone namespace
+        """
+        self.embeddings = embeddings
+        self.index = index
+        self.embed_workers = embed_workers
+        self.upsert_workers = upsert_workers
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.namespace = namespace
+        self.count_tokens = get_token_counter()
+        self.embed_backoff = RateLimitBackoff()
+        self.upsert_backoff = RateLimitBackoff()
+
+    def make_batches(self, documents: Sequence[Document]) -> Iterator[List[int]]:
+        """Group document positions into batches within the token and size budgets"""
+        batch, batch_tokens = [], 0
+        for position, doc in enumerate(documents):
+            tokens = self.count_tokens(doc.page_content)
+            if batch and (batch_tokens + tokens > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(position)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _call(self, backoff: RateLimitBackoff, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            backoff.wait()
+            try:
+                result = func(*args, **kwargs)
+                backoff.record_success()
+                return result
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                backoff.record_rate_limit(e)
+
+    def run(self, documents: Sequence[Document], ids: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Embed and upsert documents
+
+        Args:
+            documents: Chunks to index
+            ids: Vector IDs (random UUIDs when omitted)
+
+        Returns:
+            Stats with chunk count, batches, elapsed seconds, chunks/sec and 429 counts
+        """
+        ids = list(ids) if ids is not None else [str(uuid.uuid4()) for _ in documents]
+        total = len(documents)
+        upsert_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        errors: List[Exception] = []
+        stop = threading.Event()
+        progress = {"embedded": 0, "upserted": 0, "embed_requests": 0, "upsert_requests": 0}
+        progress_lock = threading.Lock()
+        start = time.perf_counter()
+
+        def embed_batch(positions: List[int]):
+            if stop.is_set():
+                return
+            try:
+                texts = [documents[p].page_content for p in positions]
+                vectors = self._call(self.embed_backoff, self.embeddings.embed_documents, texts)
+                with progress_lock:
+                    progress["embedded"] += len(positions)
+                    progress["embed_requests"] += 1
+                records = [
+                    {"id": ids[p], "values": vector, "metadata": {**documents[p].metadata, TEXT_KEY: documents[p].page_content}}
+                    for p, vector in zip(positions, vectors)
+                ]
+                for i in range(0, len(records), self.upsert_batch_size):
+                    # Blocks when the upsert workers fall behind
+                    while not stop.is_set():
+                        try:
+                            upsert_queue.put(records[i:i + self.upsert_batch_size], timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        def upsert_worker():
+            while True:
+                records = upsert_queue.get()
+                if records is None:
+                    return
+                if stop.is_set():
+                    continue
+                try:
+                    self._call(self.upsert_backoff, self.index.upsert, vectors=records, namespace=self.namespace)
+                    with progress_lock:
+                        progress["upserted"] += len(records)
+                        progress["upsert_requests"] += 1
+                        done = progress["upserted"]
+                    elapsed = time.perf_counter() - start
+                    logger.info(f"Upserted {done}/{total} chunks ({done / elapsed:.1f} chunks/sec)")
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+
+        upserters = [threading.Thread(target=upsert_worker, daemon=True) for _ in range(self.upsert_workers)]
+        for thread in upserters:
+            thread.start()
+        with ThreadPoolExecutor(max_workers=self.embed_workers) as executor:
+            list(executor.map(embed_batch, self.make_batches(documents)))
+        for _ in upserters:
+            upsert_queue.put(None)
+        for thread in upserters:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "chunks": total,
+            "embed_requests": progress["embed_requests"],
+            "upsert_requests": progress["upsert_requests"],
+            "elapsed_seconds": elapsed,
+            "chunks_per_second": total / elapsed if elapsed else 0.0,
+            "embed_rate_limited": self.embed_backoff.rate_limited,
+            "upsert_rate_limited": self.upsert_backoff.rate_limited,
+        }
+        logger.info(f"Indexed {total} chunks in {elapsed:.1f}s ({stats['chunks_per_second']:.1f} chunks/sec, "
+                    f"{stats['embed_rate_limited']} embedding / {stats['upsert_rate_limited']} upsert 429s)")
+        return stats
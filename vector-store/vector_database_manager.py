@@ -4,11 +4,14 @@ Handles loading and storing JSON data into Pinecone vector database
 
 Data Sources:
 - JSON files (scraped data or other structured data)
+
+Also exports the uploaded vectors to an on-disk FAISS index so rag.py can
+serve retrieval in-process without Pinecone.
 """
 
 import os
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 import pandas as pd
 import time
@@ -18,6 +21,8 @@ import logging
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain_core.documents import Document
 
 # Pinecone imports
@@ -25,6 +30,10 @@ from pinecone import Pinecone, ServerlessSpec
 
 from dotenv import load_dotenv
 
+from embedding_cache import PersistentEmbeddingCache
+from index_manifest import IndexManifest, chunk_ids_by_page
+from ingestion_pipeline import EmbeddingUploadPipeline
+
 # Load environment variables
 load_dotenv()
 
@@ -35,6 +44,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Crawl output of scraping/flightaware_scraper.py, and the JSON snapshot shipped with the repo
+DEFAULT_JSON_FILE = Path(__file__).resolve().parent.parent / "scraping" / "flightaware_data.jsonl"
+SNAPSHOT_JSON_FILE = DEFAULT_JSON_FILE.with_suffix(".json")
+
+# Default location of the local FAISS index (shared with rag.py)
+DEFAULT_FAISS_DIR = Path(__file__).resolve().parent / "faiss_index"
+
+# Default location of the on-disk chunk embedding cache
+DEFAULT_EMBEDDING_CACHE_DIR = Path(__file__).resolve().parent / "embedding_cache"
+
+
+def iter_json_records(json_file: Path) -> Iterator[Dict]:
+    """
+    Yield scraped records one at a time
+    
+    JSONL files (one record per line, as streamed by the scraper) are read
+    lazily; a .json file holding a single array is loaded whole.
+    
+    Args:
+        json_file: Path to a .jsonl or .json file
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        if Path(json_file).suffix == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
 
 class JSONPineconeManager:
     """
@@ -45,7 +83,9 @@ class JSONPineconeManager:
     def __init__(self, 
                  json_file: str,
                  index_name: str,
-                 embedding_model: str = "text-embedding-3-large"):
+                 embedding_model: str = "text-embedding-3-large",
+                 connect_pinecone: bool = True,
+                 embedding_cache_dir: Optional[str] = str(DEFAULT_EMBEDDING_CACHE_DIR)):
         """
         Initialize the JSON Pinecone manager
         
@@ -53,16 +93,25 @@ class JSONPineconeManager:
             json_file: Path to JSON file containing data
             index_name: Name of the Pinecone index
             embedding_model: OpenAI embedding model to use
+            connect_pinecone: Connect to Pinecone (False for local FAISS builds only)
+            embedding_cache_dir: Folder of the persistent chunk embedding cache (None disables it)
         """
         self.json_file = Path(json_file)
         self.index_name = index_name
         self.embedding_model = embedding_model
+        self.pc = None
+        self.index = None
+        # Chunk IDs per page currently in the index (for incremental sync)
+        self.manifest_path = Path(__file__).resolve().parent / f"index_manifest_{self.index_name}.json"
         
         # Initialize Pinecone
-        self.setup_pinecone()
+        if connect_pinecone:
+            self.setup_pinecone()
         
-        # Initialize embeddings
+        # Initialize embeddings (chunks already embedded by this model are read from disk)
         self.embeddings = OpenAIEmbeddings(model=self.embedding_model)
+        if embedding_cache_dir:
+            self.embeddings = PersistentEmbeddingCache(self.embeddings, embedding_cache_dir, self.embedding_model)
         
         # Initialize text splitter for long content
         self.text_splitter = RecursiveCharacterTextSplitter(
@@ -107,38 +156,52 @@ class JSONPineconeManager:
         self.index = self.pc.Index(self.index_name)
         logger.info(f"Connected to Pinecone index: {self.index_name}")
     
-    def load_json_data(self) -> List[Dict]:
+    def iter_json_data(self) -> Iterator[Dict]:
         """
-        Load JSON data from file
+        Stream records from the JSON or JSONL file
         
         Returns:
-            List of JSON objects
+            Iterator of JSON objects
         """
         logger.info(f"Loading JSON data from: {self.json_file}")
         
         if not self.json_file.exists():
             raise FileNotFoundError(f"JSON file not found: {self.json_file}")
         
-        with open(self.json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        return iter_json_records(self.json_file)
+    
+    def load_json_data(self) -> List[Dict]:
+        """
+        Load JSON data from file
         
+        Returns:
+            List of JSON objects
+        """
+        data = list(self.iter_json_data())
         logger.info(f"Loaded {len(data)} records from JSON file")
         return data
     
-    def json_to_documents(self) -> List[Document]:
+    def json_to_documents(self, skip_urls: Optional[set] = None) -> List[Document]:
         """
         Convert JSON data to LangChain Document objects
         
+        Args:
+            skip_urls: URLs of records to leave out (e.g. pages known to be unchanged)
+        
         Returns:
             List of Document objects
         """
         logger.info("Converting JSON data to documents...")
-        json_data = self.load_json_data()
-        documents = []
+        # A URL can appear twice in a resumed crawl's JSONL (kept after a failed
+        # fetch, then fetched on retry); the later record replaces the earlier one
+        pages: Dict[Any, List[Document]] = {}
+        idx = -1
         
-        for idx, item in enumerate(json_data):
+        for idx, item in enumerate(self.iter_json_data()):
             # Extract fields from JSON
             url = item.get('url', 'Unknown')
+            if skip_urls and url in skip_urls:
+                continue
             title = item.get('title', 'Unknown')
             content = item.get('content', '')
             metadata_dict = item.get('metadata', {})
@@ -168,13 +231,14 @@ class JSONPineconeManager:
             )
             
             # Split long documents into chunks
+            page = item.get('url') or idx
             if len(full_content) > 1000:
-                chunks = self.text_splitter.split_documents([doc])
-                documents.extend(chunks)
+                pages[page] = self.text_splitter.split_documents([doc])
             else:
-                documents.append(doc)
+                pages[page] = [doc]
         
-        logger.info(f"Created {len(documents)} document chunks from {len(json_data)} JSON records")
+        documents = [doc for chunks in pages.values() for doc in chunks]
+        logger.info(f"Created {len(documents)} document chunks from {idx + 1} JSON records")
         return documents
     
     def analyze_json_data(self):
@@ -183,30 +247,41 @@ class JSONPineconeManager:
         """
         logger.info("Analyzing JSON data...")
         
-        json_data = self.load_json_data()
-        
-        logger.info(f"Total records: {len(json_data)}")
-        
-        if json_data:
-            # Show sample record
-            sample = json_data[0]
-            logger.info(f"Sample record keys: {list(sample.keys())}")
-            logger.info(f"Sample URL: {sample.get('url', 'N/A')}")
-            logger.info(f"Sample title: {sample.get('title', 'N/A')[:100]}...")
-            logger.info(f"Content length: {len(sample.get('content', ''))} characters")
-            logger.info(f"Metadata keys: {list(sample.get('metadata', {}).keys())}")
-            
+        total_records = 0
+        total_content_length = 0
+        for item in self.iter_json_data():
+            if total_records == 0:
+                # Show sample record
+                logger.info(f"Sample record keys: {list(item.keys())}")
+                logger.info(f"Sample URL: {item.get('url', 'N/A')}")
+                logger.info(f"Sample title: {item.get('title', 'N/A')[:100]}...")
+                logger.info(f"Content length: {len(item.get('content', ''))} characters")
+                logger.info(f"Metadata keys: {list(item.get('metadata', {}).keys())}")
+            total_records += 1
+            total_content_length += len(item.get('content', ''))
+        
+        logger.info(f"Total records: {total_records}")
+        
+        if total_records:
             # Calculate statistics
-            total_content_length = sum(len(item.get('content', '')) for item in json_data)
-            avg_content_length = total_content_length / len(json_data)
+            avg_content_length = total_content_length / total_records
             
             logger.info(f"Average content length: {int(avg_content_length)} characters")
             logger.info(f"Total content: {total_content_length} characters")
     
-    def create_vector_store(self) -> PineconeVectorStore:
+    def create_vector_store(self, embed_workers: int = 4, upsert_workers: int = 2) -> PineconeVectorStore:
         """
         Create Pinecone vector store from JSON data
         
+        Embedding requests and upserts run concurrently in an
+        EmbeddingUploadPipeline, backing off only when rate limited. Vector IDs
+        are derived from URL + chunk text, so re-running overwrites instead of
+        duplicating; use sync_vector_store to upload only what changed.
+        
+        Args:
+            embed_workers: Concurrent embedding requests
+            upsert_workers: Concurrent upsert requests
+        
         Returns:
             PineconeVectorStore object
         """
@@ -220,24 +295,91 @@ class JSONPineconeManager:
         
         logger.info(f"Total documents to vectorize: {len(documents)}")
         
-        # Create Pinecone vector store
+        # Embed and upload to Pinecone
         logger.info("Creating embeddings and uploading to Pinecone...")
+        ids, pages = chunk_ids_by_page(documents)
+        unique = dict(zip(ids, documents))
+        pipeline = EmbeddingUploadPipeline(
+            self.embeddings,
+            self.index,
+            embed_workers=embed_workers,
+            upsert_workers=upsert_workers
+        )
+        pipeline.run(list(unique.values()), list(unique.keys()))
+        IndexManifest(self.manifest_path, self.index_name, self.embedding_model).save(pages)
+        
         vector_store = PineconeVectorStore(
             embedding=self.embeddings,
             index=self.index
         )
         
-        # Add documents in batches to avoid timeout
-        batch_size = 100
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i+batch_size]
-            logger.info(f"Uploading batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}")
-            vector_store.add_documents(batch)
-            time.sleep(1)
-        
         logger.info("JSON Pinecone vector store created successfully!")
         return vector_store
     
+    def sync_vector_store(self, embed_workers: int = 4, upsert_workers: int = 2) -> Dict[str, Any]:
+        """
+        Incrementally update the index to match the JSON data
+        
+        Only chunks that are new or changed since the last upload (per the local
+        manifest) are embedded; vectors of changed chunks and removed pages are
+        deleted. Records the scraper flagged "changed": false keep their
+        indexed chunks without being re-chunked.
+        
+        Args:
+            embed_workers: Concurrent embedding requests
+            upsert_workers: Concurrent upsert requests
+        
+        Returns:
+            Counts of added, removed and unchanged chunks
+        """
+        logger.info("Syncing JSON Pinecone vector store...")
+        
+        manifest = IndexManifest.load(self.manifest_path, self.index_name, self.embedding_model)
+        # The last record of a URL decides (see json_to_documents)
+        changed_flags = {item.get('url', 'Unknown'): item.get('changed') for item in self.iter_json_data()}
+        unchanged_urls = {url for url, changed in changed_flags.items() if changed is False and url in manifest.pages}
+        if unchanged_urls:
+            logger.info(f"{len(unchanged_urls)} pages flagged unchanged by the scraper, keeping their chunks")
+        
+        documents = self.json_to_documents(skip_urls=unchanged_urls)
+        ids, pages = chunk_ids_by_page(documents)
+        pages.update({url: manifest.pages[url] for url in unchanged_urls})
+        
+        if not manifest.exists:
+            logger.warning("No index manifest found: uploading every chunk. Vectors uploaded "
+                           "before chunk IDs were deterministic are not tracked; clear the index "
+                           "first to remove them")
+        changes = manifest.diff(pages)
+        logger.info(f"{len(changes['added'])} chunks to embed, {len(changes['removed'])} to delete, "
+                    f"{changes['unchanged']} unchanged ({changes['pages_changed']} pages changed, "
+                    f"{changes['pages_removed']} removed)")
+        
+        # Embed and upsert new or changed chunks
+        new_chunks = {vector_id: doc for vector_id, doc in zip(ids, documents) if vector_id in changes['added']}
+        if new_chunks:
+            pipeline = EmbeddingUploadPipeline(
+                self.embeddings,
+                self.index,
+                embed_workers=embed_workers,
+                upsert_workers=upsert_workers
+            )
+            pipeline.run(list(new_chunks.values()), list(new_chunks.keys()))
+        
+        # Delete vectors of changed chunks and removed pages
+        removed = sorted(changes['removed'])
+        for i in range(0, len(removed), 1000):
+            self.index.delete(ids=removed[i:i + 1000])
+        
+        manifest.save(pages)
+        logger.info("JSON Pinecone vector store sync complete!")
+        return {
+            "added": len(changes['added']),
+            "removed": len(removed),
+            "unchanged": changes['unchanged'],
+            "pages_changed": changes['pages_changed'],
+            "pages_removed": changes['pages_removed'],
+        }
+    
     def load_vector_store(self) -> PineconeVectorStore:
         """
         Load existing Pinecone vector store
@@ -261,27 +403,37 @@ class JSONPineconeManager:
         
         return vector_store
     
-    def create_and_upload_vector_store(self) -> PineconeVectorStore:
+    def create_and_upload_vector_store(self, sync: bool = True) -> PineconeVectorStore:
         """
         Complete workflow: create and upload JSON vector store to Pinecone
         
+        Args:
+            sync: Upload only new or changed chunks (False re-embeds everything)
+        
         Returns:
             PineconeVectorStore object
         """
         logger.info("Starting JSON Pinecone vector store creation workflow...")
         
         # Create and upload vector store
-        vector_store = self.create_vector_store()
+        if sync:
+            self.sync_vector_store()
+            vector_store = PineconeVectorStore(embedding=self.embeddings, index=self.index)
+        else:
+            vector_store = self.create_vector_store()
         
         # Save metadata to local file for reference
         self.save_metadata()
         
+        # Save the chunks for rag.py's keyword index
+        self.export_chunks()
+        
         logger.info("JSON Pinecone vector store creation and upload complete!")
         return vector_store
     
     def save_metadata(self):
         """Save metadata about the uploaded data"""
-        json_data = self.load_json_data()
+        total_records = sum(1 for _ in self.iter_json_data())
         
         metadata = {
             "data_type": "json",
@@ -289,16 +441,37 @@ class JSONPineconeManager:
             "index_name": self.index_name,
             "json_file": str(self.json_file),
             "created_date": pd.Timestamp.now().isoformat(),
-            "total_records": len(json_data),
+            "total_records": total_records,
             "pinecone_index_stats": self.index.describe_index_stats()
         }
         
-        metadata_file = f"json_pinecone_metadata_{self.index_name}.json"
+        # Written next to this module; rag.py watches it to invalidate cached answers
+        metadata_file = Path(__file__).resolve().parent / f"json_pinecone_metadata_{self.index_name}.json"
         with open(metadata_file, 'w') as f:
             json.dump(metadata, f, indent=2, default=str)
         
         logger.info(f"Metadata saved to: {metadata_file}")
     
+    def export_chunks(self, output_path: Optional[str] = None) -> Path:
+        """
+        Write the uploaded chunks as JSON lines for rag.py's BM25 keyword index
+        
+        Args:
+            output_path: Destination file (defaults to chunks_<index_name>.jsonl next to this module)
+        
+        Returns:
+            Path of the written file
+        """
+        output_path = Path(output_path) if output_path else Path(__file__).resolve().parent / f"chunks_{self.index_name}.jsonl"
+        documents = self.json_to_documents()
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for doc in documents:
+                f.write(json.dumps({"page_content": doc.page_content, "metadata": doc.metadata}, ensure_ascii=False) + "\n")
+        
+        logger.info(f"Exported {len(documents)} chunks to: {output_path}")
+        return output_path
+    
     def search_vectors(self, query: str, k: int = 5, filter_dict: Optional[Dict] = None):
         """
         Search the Pinecone vector store
@@ -325,14 +498,84 @@ class JSONPineconeManager:
         
         return results
     
+    def fetch_pinecone_vectors(self, batch_size: int = 100):
+        """
+        Fetch every stored vector back from Pinecone without re-embedding
+        
+        Returns:
+            Tuple of (texts, vectors, metadatas, ids)
+        """
+        if self.index is None:
+            raise ValueError("Pinecone is not connected")
+        
+        texts, vectors, metadatas, ids = [], [], [], []
+        for id_batch in self.index.list():
+            for start in range(0, len(id_batch), batch_size):
+                response = self.index.fetch(ids=id_batch[start:start + batch_size])
+                for vector_id, vector in response.vectors.items():
+                    metadata = dict(vector.metadata or {})
+                    # PineconeVectorStore keeps the chunk text under the "text" key
+                    texts.append(metadata.pop("text", ""))
+                    vectors.append(vector.values)
+                    metadatas.append(metadata)
+                    ids.append(vector_id)
+        
+        logger.info(f"Fetched {len(ids)} vectors from Pinecone index: {self.index_name}")
+        return texts, vectors, metadatas, ids
+    
+    def export_faiss_index(self, output_dir: Optional[str] = None, from_pinecone: bool = True) -> FAISS:
+        """
+        Build an on-disk FAISS index of the same chunks for local retrieval
+        
+        Vectors are copied from Pinecone when available so nothing is
+        re-embedded; otherwise the JSON documents are embedded directly.
+        Inner product over L2-normalized vectors matches Pinecone's cosine metric.
+        
+        Args:
+            output_dir: Folder for the index files (defaults to vector-store/faiss_index)
+            from_pinecone: Copy vectors from Pinecone instead of embedding the JSON data
+        
+        Returns:
+            FAISS vector store
+        """
+        output_dir = Path(output_dir) if output_dir else DEFAULT_FAISS_DIR
+        logger.info(f"Building FAISS index in: {output_dir}")
+        
+        if from_pinecone:
+            texts, vectors, metadatas, ids = self.fetch_pinecone_vectors()
+        else:
+            documents = self.json_to_documents()
+            texts = [doc.page_content for doc in documents]
+            metadatas = [doc.metadata for doc in documents]
+            vectors = self.embeddings.embed_documents(texts)
+            ids = None
+        
+        if not texts:
+            raise ValueError("No vectors found to build FAISS index")
+        
+        vector_store = FAISS.from_embeddings(
+            text_embeddings=list(zip(texts, vectors)),
+            embedding=self.embeddings,
+            metadatas=metadatas,
+            ids=ids,
+            normalize_L2=True,
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+        vector_store.save_local(str(output_dir), index_name=self.index_name)
+        
+        logger.info(f"FAISS index saved with {len(texts)} vectors: {output_dir / self.index_name}.faiss")
+        return vector_store
+    
     def delete_index(self):
         """Delete the Pinecone index (use with caution!)"""
         logger.warning(f"Deleting Pinecone index: {self.index_name}")
         self.pc.delete_index(self.index_name)
+        self.manifest_path.unlink(missing_ok=True)
         logger.info("Index deleted successfully!")
 
 
-def upload_json_to_pinecone(json_file_path: str, index_name: str, embedding_model: str = "text-embedding-3-large") -> PineconeVectorStore:
+def upload_json_to_pinecone(json_file_path: str, index_name: str, embedding_model: str = "text-embedding-3-large",
+                            sync: bool = True) -> PineconeVectorStore:
     """
     Main function to upload JSON data to Pinecone vector store
     
@@ -340,6 +583,7 @@ def upload_json_to_pinecone(json_file_path: str, index_name: str, embedding_mode
         json_file_path: Path to JSON file containing data
         index_name: Name of the Pinecone index
         embedding_model: OpenAI embedding model to use
+        sync: Upload only chunks that changed since the last run (False re-embeds everything)
     
     Returns:
         PineconeVectorStore object
@@ -357,7 +601,7 @@ def upload_json_to_pinecone(json_file_path: str, index_name: str, embedding_mode
     manager.analyze_json_data()
     
     # Create and upload vector store
-    vector_store = manager.create_and_upload_vector_store()
+    vector_store = manager.create_and_upload_vector_store(sync=sync)
     
     logger.info("JSON upload to Pinecone complete!")
     
@@ -365,8 +609,12 @@ def upload_json_to_pinecone(json_file_path: str, index_name: str, embedding_mode
 
 
 if __name__ == "__main__":
-    # Example usage
+    # Example usage: upload the latest crawl, or the shipped snapshot before the first crawl
+    json_file = DEFAULT_JSON_FILE
+    if not json_file.exists():
+        logger.warning(f"{json_file} not found (run scraping/flightaware_scraper.py); uploading {SNAPSHOT_JSON_FILE}")
+        json_file = SNAPSHOT_JSON_FILE
     vector_store = upload_json_to_pinecone(
-        json_file_path="scraping/flightaware_data.json",
+        json_file_path=str(json_file),
         index_name="flightaware-data"
     )